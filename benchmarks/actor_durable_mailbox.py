@@ -0,0 +1,65 @@
+import asyncio
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.actor_system import ActorSystem
+from etl_pipes.actors.common.types import Output
+
+INPUTS = 100_000
+
+
+@dataclass
+class IncrementActor(Actor):
+    name: str = "increment_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        return Output().save_result(message_data + 1)
+
+
+async def measure(mailbox_path: Path | None) -> float:
+    actor = IncrementActor(mailbox_capacity=0, mailbox_path=mailbox_path)
+    actor_system = ActorSystem(actors=[actor])
+
+    run_task = asyncio.create_task(actor_system.run())
+
+    start = time.perf_counter()
+    for i in range(INPUTS):
+        await actor_system.insert_result_message(i, to_actor=actor.id)
+    actor_system.kill(drain=True)
+    await run_task
+    return time.perf_counter() - start
+
+
+async def measure_recovery(mailbox_path: Path) -> float:
+    # the messages are queued, but the system is stopped before processing them
+    actor = IncrementActor(mailbox_capacity=0, mailbox_path=mailbox_path)
+    actor_system = ActorSystem(actors=[actor])
+    for i in range(INPUTS):
+        await actor_system.insert_result_message(i, to_actor=actor.id)
+    actor.mailbox.close()
+
+    start = time.perf_counter()
+    recovered = IncrementActor(mailbox_capacity=0, mailbox_path=mailbox_path)
+    elapsed = time.perf_counter() - start
+
+    assert recovered.mailbox.qsize() == INPUTS
+    return elapsed
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        in_memory = await measure(None)
+        durable = await measure(Path(directory) / "processed")
+        recovery = await measure_recovery(Path(directory) / "recovered")
+
+    print(f"in-memory mailbox: {INPUTS / in_memory:.0f} msg/s")
+    print(f"durable mailbox:   {INPUTS / durable:.0f} msg/s")
+    print(f"recovery of {INPUTS} messages: {recovery:.2f} s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
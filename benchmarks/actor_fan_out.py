@@ -0,0 +1,108 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.actor_system import ActorSystem
+from etl_pipes.actors.common.tracing import Tracer
+from etl_pipes.actors.common.types import Output
+from etl_pipes.actors.metrics import ActorSystemMetrics
+
+INPUTS = 2_000
+# every input is split into 10 chunks of 5 digits
+INPUT = ",".join(["12345"] * 10)
+
+
+@dataclass
+class SplittingActor(Actor):
+    name: str = "splitting_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        output = Output()
+        for digits in message_data.split(","):
+            output.save_result(digits)
+        return output
+
+
+@dataclass
+class DigitActor(Actor):
+    name: str = "digit_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        output = Output()
+        for char in message_data:
+            output.save_result(int(char))
+        return output
+
+
+@dataclass
+class PrintActor(Actor):
+    name: str = "print_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        return Output().save_result(str(message_data))
+
+
+@dataclass
+class BatchDigitActor(DigitActor):
+    async def process_batch(self, results: list[Any]) -> Output | None:
+        return Output(results=[int(char) for digits in results for char in digits])
+
+
+@dataclass
+class BatchPrintActor(PrintActor):
+    async def process_batch(self, results: list[Any]) -> Output | None:
+        return Output(results=list(map(str, results)))
+
+
+async def measure(
+    splitting_actor: Actor,
+    digit_actor: Actor,
+    print_actor: Actor,
+    tracer: Tracer | None = None,
+    metrics: ActorSystemMetrics | None = None,
+) -> float:
+    actor_system = ActorSystem(
+        actors=[splitting_actor, digit_actor, print_actor],
+        tracer=tracer,
+        metrics=metrics,
+    )
+
+    splitting_actor >> digit_actor >> print_actor
+
+    run_task = asyncio.create_task(actor_system.run())
+
+    start = time.perf_counter()
+    for _ in range(INPUTS):
+        await actor_system.insert_result_message(INPUT, to_actor=splitting_actor.id)
+    actor_system.kill(drain=True)
+    await run_task
+    elapsed = time.perf_counter() - start
+
+    collected = actor_system.collected_results[print_actor.id].qsize()
+    assert collected == INPUTS * 50
+    return elapsed
+
+
+async def main() -> None:
+    # inputs, chunks, digits and collected outputs
+    messages = INPUTS * (1 + 10 + 50 + 50)
+
+    per_item = await measure(SplittingActor(), DigitActor(), PrintActor())
+    batched = await measure(SplittingActor(), BatchDigitActor(), BatchPrintActor())
+    traced = await measure(
+        SplittingActor(), DigitActor(), PrintActor(), Tracer(sample_rate=0.01)
+    )
+    measured = await measure(
+        SplittingActor(), DigitActor(), PrintActor(), metrics=ActorSystemMetrics()
+    )
+
+    print(f"process_result: {messages / per_item:.0f} msg/s")
+    print(f"process_batch:  {messages / batched:.0f} msg/s")
+    print(f"1% traced:      {messages / traced:.0f} msg/s")
+    print(f"with metrics:   {messages / measured:.0f} msg/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.actor_system import ActorSystem
+from etl_pipes.actors.common.types import Output
+
+INPUTS = 1_000
+ROUNDS = 1_000
+
+
+def digest(data: bytes) -> bytes:
+    for _ in range(ROUNDS):
+        data = hashlib.sha256(data).digest()
+    return data
+
+
+@dataclass
+class HashActor(Actor):
+    name: str = "hash_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        return Output().save_result(digest(message_data))
+
+
+async def measure(first_process: int | None, second_process: int | None) -> float:
+    # two cpu-bound stages, which can run in parallel on separate processes
+    first = HashActor(process=first_process)
+    second = HashActor(process=second_process)
+    actor_system = ActorSystem(actors=[first, second])
+
+    first >> second
+
+    run_task = asyncio.create_task(actor_system.run())
+
+    start = time.perf_counter()
+    for i in range(INPUTS):
+        await actor_system.insert_result_message(i.to_bytes(8), to_actor=first.id)
+    actor_system.kill(drain=True)
+    await run_task
+    elapsed = time.perf_counter() - start
+
+    assert actor_system.collected_results[second.id].qsize() == INPUTS
+    return elapsed
+
+
+async def main() -> None:
+    single = await measure(None, None)
+    placed = await measure(0, 1)
+
+    print(f"main process:     {INPUTS / single:.0f} msg/s")
+    print(f"worker processes: {INPUTS / placed:.0f} msg/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
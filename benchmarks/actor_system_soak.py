@@ -0,0 +1,60 @@
+import asyncio
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.actor_system import ActorSystem
+from etl_pipes.actors.common.types import Output
+
+ROUNDS = 10
+MESSAGES_PER_ROUND = 5_000
+
+
+@dataclass
+class IncrementActor(Actor):
+    name: str = "increment_actor"
+
+    async def process_result(self, result: Any) -> Output | None:
+        return Output().save_result(result + 1)
+
+
+@dataclass
+class DiscardActor(Actor):
+    name: str = "discard_actor"
+
+    async def process_result(self, result: Any) -> Output | None:
+        return None
+
+
+async def main() -> None:
+    increment_actor = IncrementActor()
+    discard_actor = DiscardActor()
+    actor_system = ActorSystem(actors=[increment_actor, discard_actor])
+
+    increment_actor >> discard_actor
+
+    run_task = asyncio.create_task(actor_system.run())
+    tracemalloc.start()
+
+    for round_ in range(ROUNDS):
+        start = time.perf_counter()
+        for i in range(MESSAGES_PER_ROUND):
+            await actor_system.insert_result_message(i, to_actor=increment_actor.id)
+        await actor_system.join()
+        elapsed = time.perf_counter() - start
+
+        current, _ = tracemalloc.get_traced_memory()
+        print(
+            f"round {round_}: {MESSAGES_PER_ROUND / elapsed:.0f} msg/s, "
+            f"tasks kept: {len(actor_system.process_tasks)}, "
+            f"memory: {current / 1024:.0f} KiB"
+        )
+
+    actor_system.kill()
+    await run_task
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
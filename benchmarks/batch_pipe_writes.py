@@ -0,0 +1,77 @@
+import asyncio
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from etl_pipes.pipes.base_pipe import Pipe
+from etl_pipes.pipes.batch_pipe import BatchPipe
+from etl_pipes.pipes.pipeline.pipeline import Pipeline
+
+ROWS = 2_000
+CONCURRENCY = 100
+
+
+@dataclass
+class InsertRow(Pipe):
+    db: sqlite3.Connection
+
+    async def __call__(self, row: int) -> int:  # type: ignore[override]
+        self.db.execute("INSERT INTO items (value) VALUES (?)", (row,))
+        self.db.commit()
+        return row
+
+
+@dataclass
+class InsertRows(BatchPipe):
+    db: sqlite3.Connection
+
+    async def process_batch(self, items: list[Any]) -> list[Any]:
+        self.db.executemany(
+            "INSERT INTO items (value) VALUES (?)", [(row,) for row in items]
+        )
+        self.db.commit()
+        return items
+
+
+@dataclass
+class Identity(Pipe):
+    async def __call__(self, row: int) -> int:  # type: ignore[override]
+        return row
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE items (value INTEGER)")
+    return db
+
+
+async def measure(pipeline: Pipeline) -> float:
+    start = time.perf_counter()
+    async for _ in pipeline.stream(range(ROWS), concurrency=[1, CONCURRENCY]):
+        pass
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        per_row_db = connect(Path(tmp) / "per_row.db")
+        batched_db = connect(Path(tmp) / "batched.db")
+
+        per_row = await measure(Pipeline([Identity(), InsertRow(per_row_db)]))
+        batched = await measure(
+            Pipeline([Identity(), InsertRows(batched_db, max_batch_size=CONCURRENCY)])
+        )
+
+        print(f"{ROWS} rows written")
+        print(f"per row:  {ROWS / per_row:.0f} rows/s")
+        print(f"batched:  {ROWS / batched:.0f} rows/s")
+
+        per_row_db.close()
+        batched_db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+import time
+from dataclasses import dataclass, field, make_dataclass
+
+from etl_pipes.context import Context, single
+from etl_pipes.pipes.base_pipe import Pipe
+from etl_pipes.pipes.parallel import Parallel
+from etl_pipes.pipes.pipeline.pipeline import Pipeline
+
+PIPELINES = 2_000
+PIPES = 20
+
+# a wide context, like the settings of a request
+RequestContext = make_dataclass(
+    "RequestContext", [(f"part_{i}", int) for i in range(50)], bases=(Context,)
+)
+
+
+@dataclass
+class RequestPipe(Pipe):
+    part_0: int = single(RequestContext)  # noqa: RUF009
+    part_10: int = single(RequestContext)  # noqa: RUF009
+    part_49: int = single(RequestContext)  # noqa: RUF009
+    multiplier: int = field(default=1)
+
+    async def __call__(self, data: int) -> int:  # type: ignore[override]
+        return data * self.multiplier + self.part_0
+
+
+def build_pipeline(context: Context) -> Pipeline:
+    # pipelines are built per request, so the context is applied every time
+    return Pipeline(
+        [
+            *(RequestPipe() for _ in range(PIPES // 2)),
+            Parallel([RequestPipe() for _ in range(PIPES // 2)]),
+        ],
+        context=context,
+    )
+
+
+def main() -> None:
+    context = RequestContext(*range(50))
+
+    start = time.perf_counter()
+    for _ in range(PIPELINES):
+        build_pipeline(context)
+    elapsed = time.perf_counter() - start
+
+    print(f"{elapsed / PIPELINES * 1e6:.1f} us per pipeline of {PIPES} pipes")
+
+
+if __name__ == "__main__":
+    main()
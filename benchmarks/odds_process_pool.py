@@ -0,0 +1,47 @@
+import asyncio
+import time
+from decimal import Decimal
+from fractions import Fraction
+
+from etl_pipes.executors.process_pool import configure_process_pool
+
+ODDS = 200_000
+
+
+def to_american(fraction: Fraction) -> int:
+    value = Decimal(fraction.numerator) / Decimal(fraction.denominator) + 1
+    if value >= Decimal(2):
+        return round(100 * (value - 1))
+    return round(-100 / (value - 1))
+
+
+def build_odds() -> list[Fraction]:
+    return [Fraction(i % 97 + 1, i % 89 + 1) for i in range(ODDS)]
+
+
+async def main() -> None:
+    odds = build_odds()
+    pool = configure_process_pool(chunksize=4096)
+
+    start = time.perf_counter()
+    expected = [to_american(fraction) for fraction in odds]
+    inline = time.perf_counter() - start
+
+    # warm up workers, so their startup is not measured
+    await pool.map(to_american, odds[:1])
+
+    start = time.perf_counter()
+    result = await pool.map(to_american, odds)
+    in_processes = time.perf_counter() - start
+    assert result == expected
+
+    print(f"{ODDS} odds conversions")
+    print(f"event loop:   {inline:.3f}s")
+    print(f"process pool: {in_processes:.3f}s")
+    print(f"pool metrics: {pool.metrics}")
+
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from etl_pipes.domain.types import ExecutorKind
+from etl_pipes.executors.thread_pool import configure_thread_pool
+from etl_pipes.pipes.base_pipe import Pipe, as_pipe
+from etl_pipes.pipes.broadcast_parallel import BroadcastParallel
+
+BRANCHES = 8
+BLOCKING_SECONDS = 0.1
+
+
+def blocking_io(a: int) -> int:
+    time.sleep(BLOCKING_SECONDS)
+    return a
+
+
+def build_parallel(executor: ExecutorKind | None) -> BroadcastParallel:
+    pipes: list[Pipe] = [as_pipe(executor=executor)(blocking_io)] * BRANCHES
+    return BroadcastParallel(pipes)
+
+
+async def measure(parallel: BroadcastParallel) -> float:
+    start = time.perf_counter()
+    await parallel(1)
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    pool = configure_thread_pool(max_workers=BRANCHES)
+
+    inline = await measure(build_parallel(executor=None))
+    threaded = await measure(build_parallel(executor="thread"))
+
+    print(f"{BRANCHES} branches blocking for {BLOCKING_SECONDS}s each")
+    print(f"event loop:  {inline:.3f}s")
+    print(f"thread pool: {threaded:.3f}s")
+    print(f"pool metrics: {pool.metrics}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+from etl_pipes.pipes.base_pipe import as_pipe
+from etl_pipes.pipes.pipeline.pipeline import Pipeline
+
+CALLS = 100_000
+
+
+@as_pipe
+def split(a: int) -> tuple[int, int, int]:
+    return a, a + 1, a + 2
+
+
+@as_pipe
+def sum_pair(a: int, b: int) -> int:
+    return a + b
+
+
+@as_pipe
+async def inc(a: int) -> int:
+    return a + 1
+
+
+def build_pipeline() -> Pipeline:
+    return Pipeline(
+        [
+            split[0:2],
+            sum_pair,
+            Pipeline([inc, inc, Pipeline([inc, inc])]),
+            split[(0, 2)],
+            sum_pair,
+            inc,
+        ]
+    )
+
+
+async def measure(pipeline: Pipeline) -> float:
+    start = time.perf_counter()
+    for i in range(CALLS):
+        await pipeline(i)
+    return (time.perf_counter() - start) / CALLS
+
+
+async def main() -> None:
+    interpreted = build_pipeline()
+    compiled = build_pipeline().compile()
+    assert await interpreted(1) == await compiled(1)
+
+    interpreted_per_call = await measure(interpreted)
+    compiled_per_call = await measure(compiled)
+
+    print(f"interpreted: {interpreted_per_call * 1e6:.2f} us/call")
+    print(f"compiled:    {compiled_per_call * 1e6:.2f} us/call")
+    print(f"speedup:     {interpreted_per_call / compiled_per_call:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
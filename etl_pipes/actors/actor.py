@@ -1,29 +1,141 @@
 from __future__ import annotations
 
 import asyncio
-import uuid
 from collections.abc import AsyncGenerator
 from dataclasses import dataclass, field
-from typing import Any
-
-from etl_pipes.actors.common.types import ActorId, IActorSystem, Output
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from etl_pipes.actors.common.ids import next_id
+from etl_pipes.actors.common.logging import actor_logger
+from etl_pipes.actors.common.types import (
+    ActorId,
+    IActorSystem,
+    Message,
+    Output,
+    OutputType,
+)
+from etl_pipes.actors.durable_mailbox import DurableMailbox
+from etl_pipes.actors.mailbox import Mailbox, OverflowPolicy
+
+if TYPE_CHECKING:
+    from etl_pipes.actors.metrics import ActorMetrics
 
 
 @dataclass
 class Actor:
     name: str
-    id: ActorId = field(init=False, default_factory=lambda: ActorId(str(uuid.uuid4())))
-
-    results_buffer: asyncio.Queue[Any] = field(
-        init=False, default_factory=asyncio.Queue
-    )
-    exceptions_buffer: asyncio.Queue[Exception] = field(
-        init=False, default_factory=asyncio.Queue
-    )
+    id: ActorId = field(init=False, default_factory=lambda: ActorId(next_id()))
+
+    # messages waiting to be processed, the capacity bounds memory per actor
+    mailbox_capacity: int = field(default=1024, kw_only=True)
+    overflow_policy: OverflowPolicy = field(default=OverflowPolicy.BLOCK, kw_only=True)
+    # maximum number of messages processed concurrently
+    workers: int = field(default=32, kw_only=True)
+    # index of the worker process the actor runs on, None for the main process
+    process: int | None = field(default=None, kw_only=True)
+    # directory of a durable mailbox, queued messages survive restarts
+    mailbox_path: Path | None = field(default=None, kw_only=True)
+
+    mailbox: Mailbox[Message] = field(init=False)
+    results_buffer: Mailbox[Any] = field(init=False)
+    exceptions_buffer: Mailbox[Exception] = field(init=False)
+
+    # messages taken from the mailbox and not processed yet
+    in_flight: int = field(init=False, default=0)
+    # senders which did not end their streams yet, counted at the first end
+    open_inputs: int | None = field(init=False, default=None)
+    # set for members of a pool, they send outputs on behalf of the pool
+    pool: Actor | None = field(init=False, default=None, repr=False)
 
     receiving_actors: dict[ActorId, Actor] = field(init=False, default_factory=dict)
     sending_actors: dict[ActorId, Actor] = field(init=False, default_factory=dict)
     system: IActorSystem | None = field(init=False, default=None)
+    # set by a supervisor, the messages go to the dead letters unprocessed
+    stopped: bool = field(init=False, default=False)
+    # assigned by the actor system when it collects metrics
+    metrics: ActorMetrics | None = field(init=False, default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.workers < 1:
+            raise ValueError("Actor must have at least one worker")
+        if self.process is not None and self.process < 0:
+            raise ValueError("Actor process must not be negative")
+        if self.mailbox_path is not None and self.process is not None:
+            raise ValueError("Durable mailboxes are only supported in the main process")
+
+        self.create_mailboxes()
+
+    def create_mailboxes(self) -> None:
+        if self.mailbox_path is not None:
+            self.mailbox = DurableMailbox(
+                self.mailbox_capacity, self.overflow_policy, path=self.mailbox_path
+            )
+        else:
+            self.mailbox = Mailbox(self.mailbox_capacity, self.overflow_policy)
+        self.results_buffer = Mailbox(self.mailbox_capacity, self.overflow_policy)
+        self.exceptions_buffer = Mailbox(self.mailbox_capacity, self.overflow_policy)
+
+    async def message_loop(self) -> None:
+        # the actor system starts one loop per worker
+        system = self.get_system()
+        while True:
+            message = await self.mailbox.get()
+            self.in_flight += 1
+            metrics = self.metrics
+            started_at = perf_counter() if metrics is not None else 0.0
+            processed: Message | None = message
+            try:
+                if self.stopped:
+                    await system.dead_letter(self, message)
+                else:
+                    await self.process_message(message)
+            except asyncio.CancelledError:
+                # durable mailboxes deliver unfinished messages again
+                processed = None
+                raise
+            except Exception as e:
+                if metrics is not None:
+                    metrics.failures += 1
+                actor_logger.exception("%s failed to process a message", self.name)
+                await self._handle_failure(message, e)
+            finally:
+                if metrics is not None:
+                    metrics.on_processed(message, perf_counter() - started_at)
+                self.in_flight -= 1
+                self.mailbox.task_done(processed)
+                system.message_done()
+
+    async def process_message(self, message: Message) -> None:
+        match message.output_type, message.is_batch:
+            case OutputType.RESULT, False:
+                output = await self.process_result(message.data)
+            case OutputType.EXCEPTION, False:
+                output = await self.process_exception(message.data)
+            case OutputType.RESULT, True:
+                output = await self.process_batch(message.data)
+            case OutputType.EXCEPTION, True:
+                output = await self.process_exception_batch(message.data)
+            case OutputType.END, _:
+                # ends of streams are not queued, see ActorSystem._put
+                raise ValueError(f"{self.name} got an end of stream message")
+        if output is not None:
+            if self.metrics is not None:
+                self.metrics.on_output(output)
+            await self.get_system().distribute_output(
+                message.trace_id, output, self.pool or self, message.started_at
+            )
+
+    def get_system(self) -> IActorSystem:
+        if self.system is None:
+            raise RuntimeError(f"{self.name} is not added to an actor system")
+        return self.system
+
+    async def on_restart(self) -> None:
+        # called by a supervisor after process_result raised, the actor is not
+        # recreated, so actors with state must reset it here
+        pass
 
     async def process_result(self, result: Any) -> Output | None:
         raise NotImplementedError("Actor must implement process_message method")
@@ -31,6 +143,64 @@ class Actor:
     async def process_exception(self, exception: Exception) -> Output | None:
         return Output().save_exception(exception)
 
+    def processes_batches(self, output_type: OutputType) -> bool:
+        # outputs are delivered in batches only to actors which override
+        # the batch methods, the default ones process the items sequentially
+        if output_type is OutputType.EXCEPTION:
+            method = type(self).process_exception_batch
+            return method is not Actor.process_exception_batch
+        return type(self).process_batch is not Actor.process_batch
+
+    async def process_batch(self, results: list[Any]) -> Output | None:
+        # actors can override it to process a whole batch at once,
+        # the list is shared between the receivers and must not be changed
+        output = Output()
+        for result in results:
+            if self.stopped:
+                # stopped by a supervisor after an earlier item failed
+                await self.get_system().dead_letter(self, self._item(result))
+                continue
+            try:
+                result_output = await self.process_result(result)
+            except Exception as e:
+                # only the failed item is lost, the outputs of the others are kept
+                if self.metrics is not None:
+                    self.metrics.failures += 1
+                actor_logger.exception("%s failed to process a message", self.name)
+                await self._handle_failure(self._item(result), e)
+                continue
+            if result_output is not None:
+                output.merge(result_output)
+        return output
+
+    async def _handle_failure(self, message: Message, exception: Exception) -> None:
+        try:
+            await self.get_system().handle_failure(self, message, exception)
+        except Exception:
+            # e.g. on_restart raised, the state of the actor is unknown, so it is
+            # stopped and its next messages go to the dead letters
+            actor_logger.exception("%s failed to handle a failure", self.name)
+            self.stopped = True
+
+    def _item(self, result: Any) -> Message:
+        # a message of a single item of a batch, for the dead letters
+        return Message(data=result, receiver_id=self.id)
+
+    async def process_exception_batch(
+        self, exceptions: list[Exception]
+    ) -> Output | None:
+        output = Output()
+        for exception in exceptions:
+            exception_output = await self.process_exception(exception)
+            if exception_output is not None:
+                output.merge(exception_output)
+        return output
+
+    async def process_end(self) -> Output | None:
+        # called once all inputs ended and their messages are processed,
+        # actors which buffer outputs emit them here
+        return None
+
     async def save_result(self, result: Any) -> None:
         await self.results_buffer.put(result)
 
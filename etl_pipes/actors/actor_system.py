@@ -1,22 +1,34 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import time
 from collections import defaultdict
-from collections.abc import AsyncGenerator, Callable, Coroutine
+from collections.abc import AsyncGenerator, Coroutine
 from dataclasses import dataclass, field
 from datetime import timedelta
 from typing import Any
 
 from etl_pipes.actors.actor import Actor
-from etl_pipes.actors.common.logging import log_message_info
+from etl_pipes.actors.common.ids import next_id
+from etl_pipes.actors.common.logging import actor_logger
+from etl_pipes.actors.common.tracing import Tracer
 from etl_pipes.actors.common.types import (
     ActorId,
     Message,
-    MessageId,
     MessageTraceId,
     Output,
     OutputType,
 )
+from etl_pipes.actors.mailbox import Mailbox, MailboxFullError, OverflowPolicy
+from etl_pipes.actors.metrics import (
+    ActorSystemMetrics,
+    MetricsExporter,
+    MetricsSnapshot,
+)
+from etl_pipes.actors.placement import Node, ProcessCluster
+from etl_pipes.actors.pool import Pool
+from etl_pipes.actors.supervision import DeadLetter, Supervisor
 
 
 @dataclass
@@ -25,102 +37,402 @@ class ActorSystem:
     connections: list[tuple[Actor, Actor]] = field(default_factory=list)
 
     no_outcome_timeout: timedelta = field(default_factory=lambda: timedelta(seconds=10))
+    # traces all messages and logs them with their data
     debug: bool = field(default=False)
+    tracer: Tracer | None = field(default=None)
+    # counts messages and latencies of the actors in the current process
+    metrics: ActorSystemMetrics | None = field(default=None)
+
+    # capacity of the queues with outputs of the last actors, 0 means unbounded,
+    # bounded queues block the last actors until the outputs are streamed
+    collected_capacity: int = field(default=0)
+    # outputs of an actor are sent to every receiver in batches of this size
+    max_batch_size: int = field(default=1000)
+
+    # actors are restarted by their supervisors when process_result raises
+    supervisors: list[Supervisor] = field(default_factory=list)
+    # the oldest dead letters are dropped when nobody reads them
+    dead_letters_capacity: int = field(default=1024)
+    # messages which failed or were sent to stopped actors, of the current process
+    dead_letters: Mailbox[DeadLetter] = field(init=False)
 
     should_be_killed_event: asyncio.Event = field(
         init=False, default_factory=asyncio.Event
     )
 
-    results_to_send: asyncio.Queue[Message] = field(
-        init=False, default_factory=asyncio.Queue
-    )
-    exceptions_to_send: asyncio.Queue[Message] = field(
-        init=False, default_factory=asyncio.Queue
-    )
-
-    collected_results: dict[ActorId, asyncio.Queue[Message]] = field(
-        init=False, default_factory=lambda: defaultdict(asyncio.Queue)
-    )
-    collected_exceptions: dict[ActorId, asyncio.Queue[Message]] = field(
-        init=False, default_factory=lambda: defaultdict(asyncio.Queue)
-    )
+    collected_results: dict[ActorId, asyncio.Queue[Message]] = field(init=False)
+    collected_exceptions: dict[ActorId, asyncio.Queue[Message]] = field(init=False)
 
     actors_dict: dict[ActorId, Actor] = field(default_factory=dict)
     actor_ids: set[ActorId] = field(default_factory=set)
     resulting_actor_ids: set[ActorId] = field(default_factory=set)
     starting_actor_ids: set[ActorId] = field(default_factory=set)
 
-    process_tasks: dict[MessageId, asyncio.Task[None]] = field(default_factory=dict)
+    # tasks are removed from the set as soon as they are done
+    process_tasks: set[asyncio.Task[None]] = field(default_factory=set)
+    # message loops of every actor, to stop actors removed at runtime
+    actor_tasks: dict[ActorId, list[asyncio.Task[None]]] = field(
+        init=False, default_factory=dict
+    )
+    running: bool = field(init=False, default=False)
+    # when set, the system finishes in-flight messages before it stops,
+    # otherwise they are cancelled
+    drain_on_kill: bool = field(init=False, default=False)
+
+    # messages which are queued or being processed, including ends of streams
+    pending_messages: int = field(init=False, default=0)
+    idle_event: asyncio.Event = field(init=False, default_factory=asyncio.Event)
+    # raised by run() before the actors were started, see join
+    startup_error: Exception | None = field(init=False, default=None)
+
+    # the process this system runs in, None for the main process
+    node: Node = field(init=False, default=None)
+    # set when some actors are placed on worker processes
+    cluster: ProcessCluster | None = field(init=False, default=None)
+    # ends of streams which are still expected by the collected queues
+    open_collected: dict[ActorId, int] = field(init=False, default_factory=dict)
 
     def __post_init__(self) -> None:
+        if self.max_batch_size < 1:
+            raise ValueError("max_batch_size must be positive")
+        if self.debug and self.tracer is None:
+            self.tracer = Tracer(log_level=logging.INFO, log_data=True)
+
+        # members of pools are added to the list
+        self.actors = list(self.actors)
         self.actors_dict = {actor.id: actor for actor in self.actors}
         self.actor_ids = {actor.id for actor in self.actors}
-        for actor in self.actors:
+        for actor in list(self.actors):
             actor.system = self
+            if self.metrics is not None:
+                self.metrics.register(actor)
+            self._count_recovered(actor)
+            if isinstance(actor, Pool):
+                for member in actor.members:
+                    self.add_actor(member)
+
+        self.collected_results = defaultdict(self._create_collected_queue)
+        self.collected_exceptions = defaultdict(self._create_collected_queue)
+        self.dead_letters = Mailbox(
+            self.dead_letters_capacity, OverflowPolicy.DROP_OLDEST
+        )
+        self.idle_event.set()
+
+    def _create_collected_queue(self) -> asyncio.Queue[Message]:
+        return asyncio.Queue(self.collected_capacity)
 
     async def run(self) -> None:
-        self.generate_pairs()
+        try:
+            self.generate_pairs()
+            if any(actor.process is not None for actor in self.actors):
+                # workers are forked before the actors are started
+                await ProcessCluster.start(self)
+        except Exception as e:
+            # nothing would ever process the messages, so join stops waiting
+            self.startup_error = e
+            self.idle_event.set()
+            if self.cluster is not None:
+                await self.cluster.stop()
+            raise
+        self.running = True
+        self.start_actors()
+        if self.metrics is not None and self.metrics.exporter is not None:
+            self._spawn(self._export_metrics(self.metrics.exporter))
 
-        async def process_message(
-            message: Message,
-            process_func: Callable[[Actor, Any], Coroutine[None, None, Output | None]],
-            collected: dict[ActorId, asyncio.Queue[Message]],
-        ) -> None:
-            if message.receiver_id is None:
-                log_action = (
-                    "considered to be saved"
-                    if message.sender_id
-                    else "considered to be discarded"
-                )
+        await self.should_be_killed_event.wait()
 
-                self.debug and log_message_info(  # type: ignore[func-returns-value]
-                    message, log_action, log_data=True
-                )
+        if self.drain_on_kill:
+            await self.join()
+        if self.cluster is not None:
+            await self.cluster.stop()
 
-                if message.sender_id:
-                    await collected[message.sender_id].put(message)
-                return
+        tasks = list(self.process_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.running = False
+        for actor in self.actors:
+            actor.mailbox.close()
+
+        if self.metrics is not None and self.metrics.exporter is not None:
+            # the final state is exported after the actors are stopped
+            self.metrics.exporter.export(self.metrics_snapshot())
+
+    async def _export_metrics(self, exporter: MetricsExporter) -> None:
+        while self.metrics is not None:
+            await asyncio.sleep(self.metrics.export_interval.total_seconds())
+            exporter.export(self.metrics_snapshot())
+
+    def metrics_snapshot(self) -> MetricsSnapshot:
+        if self.metrics is None:
+            raise RuntimeError("Metrics are not collected by the actor system")
+        pending_messages = (
+            self.cluster.pending.value
+            if self.cluster is not None
+            else self.pending_messages
+        )
+        return self.metrics.snapshot(self.actors_dict, pending_messages)
+
+    def start_actors(self) -> None:
+        # every actor reads its own mailbox, there is no central message loop
+        for actor in self.actors:
+            self._start_actor(actor)
+
+    def _start_actor(self, actor: Actor) -> None:
+        if isinstance(actor, Pool):
+            # messages are routed to the members, see deliver
+            return
+        if actor.process != self.node:
+            if self.cluster is not None and self.node is None:
+                # messages put before the workers were started
+                self._spawn(self.cluster.forward(actor))
+            return
+        if self.node is not None:
+            # queues created in the main process can't be used after fork
+            actor.create_mailboxes()
+        self.actor_tasks[actor.id] = [
+            self._spawn(actor.message_loop()) for _ in range(actor.workers)
+        ]
 
-            self.debug and log_message_info(  # type: ignore[func-returns-value]
-                message, "considered to be sent", log_data=True
+    def add_actor(self, actor: Actor) -> None:
+        if self.running and actor.process != self.node:
+            raise ValueError("Actors can't be placed on processes of a running system")
+
+        self.actors.append(actor)
+        self.actors_dict[actor.id] = actor
+        self.actor_ids.add(actor.id)
+        actor.system = self
+        if self.metrics is not None:
+            self.metrics.register(actor)
+        self._count_recovered(actor)
+        if self.running:
+            self._start_actor(actor)
+
+    def _count_recovered(self, actor: Actor) -> None:
+        # durable mailboxes start with the messages left before a restart
+        for _ in range(actor.mailbox.qsize()):
+            self._message_queued()
+
+    async def remove_actor(self, actor: Actor) -> None:
+        self.actors.remove(actor)
+        del self.actors_dict[actor.id]
+        self.actor_ids.discard(actor.id)
+        if self.metrics is not None:
+            self.metrics.unregister(actor)
+
+        tasks = self.actor_tasks.pop(actor.id, [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        actor.mailbox.close()
+
+    async def join(self) -> None:
+        # returns as soon as all queued and in-flight messages are processed
+        if self.startup_error is None:
+            await self.idle_event.wait()
+        if self.startup_error is not None:
+            raise RuntimeError("Actor system failed to start") from self.startup_error
+        if self.cluster is not None:
+            # the event is set when the workers are started, see ProcessCluster
+            await self.cluster.wait_until_idle()
+
+    async def drain(self) -> None:
+        # ends the input of the source actors and waits until the ends of streams
+        # reach the last actors, so the outputs can be streamed without timeouts
+        await self.end_input()
+        await self.join()
+
+    async def end_input(self, actor: Actor | None = None) -> None:
+        # nothing else will be inserted into the actor, by default into any source
+        if actor is not None:
+            sources = [actor]
+        else:
+            sources = [
+                actor
+                for actor in self.actors
+                if not actor.sending_actors and actor.pool is None
+            ]
+        for source in sources:
+            await self.deliver(
+                Message(data=None, receiver_id=source.id, output_type=OutputType.END),
+                source,
             )
 
+    def _spawn(self, coroutine: Coroutine[None, None, None]) -> asyncio.Task[None]:
+        task = asyncio.create_task(coroutine)
+        self.process_tasks.add(task)
+        task.add_done_callback(self.process_tasks.discard)
+        return task
+
+    def _message_queued(self) -> None:
+        if self.cluster is not None:
+            self.cluster.add_pending(1)
+            return
+        self.pending_messages += 1
+        self.idle_event.clear()
+
+    def message_done(self) -> None:
+        if self.cluster is not None:
+            self.cluster.add_pending(-1)
+            return
+        self.pending_messages -= 1
+        if not self.pending_messages:
+            self.idle_event.set()
+
+    async def deliver(self, message: Message, receiver: Actor) -> None:
+        if isinstance(receiver, Pool):
+            for member_message, member in receiver.route(message):
+                member_message.receiver_id = member.id
+                await self.deliver(member_message, member)
+            return
+
+        if self.tracer is not None:
+            self.tracer.record("considered to be sent", receiver.name, message)
+
+        self._message_queued()
+        if self.cluster is not None and receiver.process != self.node:
+            await self.cluster.send(receiver.process, message)
+            return
+        await self._put(message, receiver)
+
+    async def receive(self, messages: list[Message]) -> None:
+        # messages sent by other processes, they are already counted as pending
+        for message in messages:
+            if message.receiver_id is None:
+                await self.collect(message)
+                self.message_done()
+                continue
             receiver = self.actors_dict[message.receiver_id]
-            output = await process_func(receiver, message.data)
-            if output is not None:
-                await self.distribute_output(message.trace_id, output, receiver)
-
-        async def message_loop(
-            queue: asyncio.Queue[Message],
-            process_func: Callable[[Actor, Any], Coroutine[None, None, Output | None]],
-            collected: dict[ActorId, asyncio.Queue[Message]],
-        ) -> None:
-            while True:
-                message = await queue.get()
-                self.process_tasks[message.id] = asyncio.create_task(
-                    process_message(message, process_func, collected)
+            try:
+                await self._put(message, receiver)
+            except MailboxFullError:
+                # senders in other processes can't get the error
+                actor_logger.warning(
+                    "Mailbox of %s is full, message is rejected", receiver.name
                 )
 
-        async def process_result(receiver: Actor, data: Any) -> Output | None:
-            return await receiver.process_result(data)
-
-        async def process_exception(receiver: Actor, data: Exception) -> Output | None:
-            return await receiver.process_exception(data)
-
-        # Starting the result and exception processing loops
-        result_task = asyncio.create_task(
-            message_loop(self.results_to_send, process_result, self.collected_results)
-        )
-        exception_task = asyncio.create_task(
-            message_loop(
-                self.exceptions_to_send, process_exception, self.collected_exceptions
+    async def _put(self, message: Message, receiver: Actor) -> None:
+        if message.output_type is OutputType.END:
+            if receiver.process == self.node:
+                # ends of streams are counted as they arrive instead of being
+                # queued, so overflow policies never drop them, the end of
+                # the output still waits for the queued messages, see _end_output_of
+                self.end_input_of(receiver)
+                self.message_done()
+                return
+            # forwarded to the worker process through the mailbox
+            await receiver.mailbox.queue.put(message)
+            return
+
+        try:
+            dropped = await receiver.mailbox.put(message)
+        except BaseException:
+            # not queued, e.g. MailboxFullError or a message which can't be
+            # pickled into a durable mailbox, the sender gets the error
+            self.message_done()
+            raise
+        if dropped is not None:
+            self.message_done()
+
+    def end_input_of(self, actor: Actor) -> None:
+        if actor.open_inputs is None:
+            # members of a pool get the ends sent to the pool
+            actor.open_inputs = self._expected_ends(actor.pool or actor)
+        actor.open_inputs -= 1
+        if actor.open_inputs:
+            return
+
+        # the end is pending until the actor processes all its messages
+        self._message_queued()
+        self._spawn(self._end_output_of(actor))
+
+    async def _end_output_of(self, actor: Actor) -> None:
+        # waits for the messages which are still processed by other workers
+        await actor.mailbox.join()
+
+        sender = actor.pool or actor
+        try:
+            output = await actor.process_end()
+        except Exception:
+            actor_logger.exception("%s failed to process the end", actor.name)
+            output = None
+        if output is not None:
+            await self.distribute_output(None, output, sender)
+
+        receivers = list(sender.receiving_actors.values())
+        if not receivers:
+            await self.collect(
+                Message(data=None, sender_id=sender.id, output_type=OutputType.END)
+            )
+        for receiver in receivers:
+            message = Message(
+                data=None,
+                receiver_id=receiver.id,
+                sender_id=sender.id,
+                output_type=OutputType.END,
             )
+            await self.deliver(message, receiver)
+        self.message_done()
+
+    @staticmethod
+    def _expected_ends(actor: Actor) -> int:
+        # every member of a pool ends its stream separately
+        return (
+            sum(
+                len(sender.members) if isinstance(sender, Pool) else 1
+                for sender in actor.sending_actors.values()
+            )
+            or 1
         )
 
-        await self.should_be_killed_event.wait()
+    async def collect(self, message: Message) -> None:
+        if self.tracer is not None and message.sender_id:
+            sender = self.actors_dict[message.sender_id]
+            self.tracer.record("considered to be saved", sender.name, message)
+
+        if self.cluster is not None and self.node is not None:
+            # outputs are streamed from the main process
+            self._message_queued()
+            await self.cluster.send(None, message)
+            return
+
+        if not message.sender_id:
+            return
+        if self.metrics is not None and message.output_type is not OutputType.END:
+            self.metrics.on_collected(message)
+
+        match message.output_type:
+            case OutputType.RESULT:
+                await self.collected_results[message.sender_id].put(message)
+            case OutputType.EXCEPTION:
+                await self.collected_exceptions[message.sender_id].put(message)
+            case OutputType.END:
+                sender = self.actors_dict[message.sender_id]
+                open_collected = self.open_collected.get(
+                    sender.id, len(sender.members) if isinstance(sender, Pool) else 1
+                )
+                self.open_collected[sender.id] = open_collected - 1
+                if open_collected == 1:
+                    await self.collected_results[sender.id].put(message)
+                    await self.collected_exceptions[sender.id].put(message)
+
+    async def handle_failure(
+        self, actor: Actor, message: Message, exception: Exception
+    ) -> None:
+        # the message is kept, it can be inspected and inserted again
+        await self.dead_letter(actor, message, exception)
+        for supervisor in self.supervisors:
+            child = supervisor.supervises(actor)
+            if child is not None:
+                await supervisor.handle_failure(child)
+                return
 
-        result_task.cancel()
-        exception_task.cancel()
+    async def dead_letter(
+        self, actor: Actor, message: Message, exception: Exception | None = None
+    ) -> None:
+        if self.tracer is not None:
+            self.tracer.record("considered to be dead", actor.name, message)
+        await self.dead_letters.put(DeadLetter(actor.name, message, exception))
 
     def generate_pairs(self) -> None:
         pairs = set()
@@ -133,28 +445,56 @@ class ActorSystem:
         ]
 
     async def distribute_output(
-        self, trace_id: MessageTraceId, output: Output, sender: Actor
+        self,
+        trace_id: MessageTraceId | None,
+        output: Output,
+        sender: Actor,
+        started_at: float | None = None,
     ) -> None:
-        async def queue_messages(
-            data_items: list[Any], queue: asyncio.Queue[Any]
-        ) -> None:
-            receiver_ids = sender.receiving_actors or [
-                None
-            ]  # Default to [None] if empty
-            for data_item in data_items:
-                for receiver_id in receiver_ids:
+        receivers = list(sender.receiving_actors.values())
+        outputs: list[tuple[OutputType, list[Any]]] = [
+            (OutputType.RESULT, output.results),
+            (OutputType.EXCEPTION, output.exceptions),
+        ]
+        for output_type, data_items in outputs:
+            if not receivers:
+                # the outputs of the last actors are collected for streaming
+                for data_item in data_items:
+                    await self.collect(
+                        Message(
+                            data=data_item,
+                            sender_id=sender.id,
+                            trace_id=trace_id,
+                            output_type=output_type,
+                            started_at=started_at,
+                        )
+                    )
+                continue
+
+            for receiver in receivers:
+                # a batch is processed by a single worker, so items are sent
+                # one by one to receivers which don't process whole batches
+                batch_size = (
+                    self.max_batch_size
+                    if receiver.processes_batches(output_type)
+                    else 1
+                )
+                for start in range(0, len(data_items), batch_size):
+                    batch = data_items[start : start + batch_size]
+                    is_batch = len(batch) > 1
                     message = Message(
-                        data=data_item,
-                        receiver_id=receiver_id,
+                        data=batch if is_batch else batch[0],
+                        receiver_id=receiver.id,
                         sender_id=sender.id,
                         trace_id=trace_id,
+                        output_type=output_type,
+                        is_batch=is_batch,
+                        started_at=started_at,
                     )
-                    await queue.put(message)
-
-        await queue_messages(output.results, self.results_to_send)
-        await queue_messages(output.exceptions, self.exceptions_to_send)
+                    await self.deliver(message, receiver)
 
-    def kill(self) -> None:
+    def kill(self, drain: bool = False) -> None:
+        self.drain_on_kill = drain
         self.should_be_killed_event.set()
 
     async def stream_actor_unpacked_results(
@@ -196,9 +536,13 @@ class ActorSystem:
                 message = await asyncio.wait_for(
                     queue.get(), timeout=timeout.total_seconds()
                 )
-                yield message
             except TimeoutError:
                 break
+            if message.output_type is OutputType.END:
+                # kept in the queue, so the output can be streamed again
+                queue.put_nowait(message)
+                break
+            yield message
 
     def get_collected_outputs(
         self,
@@ -219,7 +563,7 @@ class ActorSystem:
         from_actor: ActorId | None = None,
         to_actor: ActorId | None = None,
     ) -> None:
-        await self.insert_message(self.results_to_send, data, from_actor, to_actor)
+        await self.insert_message(data, from_actor, to_actor, OutputType.RESULT)
 
     async def insert_exception_message(
         self,
@@ -227,21 +571,38 @@ class ActorSystem:
         from_actor: ActorId | None = None,
         to_actor: ActorId | None = None,
     ) -> None:
-        await self.insert_message(self.exceptions_to_send, data, from_actor, to_actor)
+        await self.insert_message(data, from_actor, to_actor, OutputType.EXCEPTION)
 
     async def insert_message(
         self,
-        queue: asyncio.Queue[Message],
         data: Any,
         from_actor: ActorId | None,
         to_actor: ActorId | None,
+        output_type: OutputType,
     ) -> None:
-        if to_actor:
-            message = Message(data=data, receiver_id=to_actor)
-            await queue.put(message)
+        # trace ids are only needed to follow traced messages
+        trace_id = MessageTraceId(next_id()) if self.tracer is not None else None
+        # latencies are measured from here to the collected outputs
+        started_at = time.perf_counter() if self.metrics is not None else None
+
+        if to_actor is not None:
+            message = Message(
+                data=data,
+                trace_id=trace_id,
+                receiver_id=to_actor,
+                output_type=output_type,
+                started_at=started_at,
+            )
+            await self.deliver(message, self.actors_dict[to_actor])
 
-        if from_actor:
+        if from_actor is not None:
             receivers = self.actors_dict[from_actor].receiving_actors
-            for receiver_id in receivers:
-                message = Message(data=data, receiver_id=receiver_id)
-                await queue.put(message)
+            for receiver_id, receiver in receivers.items():
+                message = Message(
+                    data=data,
+                    trace_id=trace_id,
+                    receiver_id=receiver_id,
+                    output_type=output_type,
+                    started_at=started_at,
+                )
+                await self.deliver(message, receiver)
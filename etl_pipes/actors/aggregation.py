@@ -0,0 +1,442 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from datetime import timedelta
+from enum import Enum
+from typing import Any, Protocol
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.common.types import Output
+
+
+@dataclass(frozen=True)
+class Aggregator:
+    # aggregates are updated with every value, so no raw values are buffered,
+    # the functions must return new accumulators instead of changing them
+    create: Callable[[], Any]
+    add: Callable[[Any, Any], Any]
+    # combines partial aggregates of the panes of sliding windows
+    merge: Callable[[Any, Any], Any]
+    result: Callable[[Any], Any] = field(default=lambda accumulator: accumulator)
+
+
+def _min(accumulator: Any, value: Any) -> Any:
+    return value if accumulator is None or value < accumulator else accumulator
+
+
+def _max(accumulator: Any, value: Any) -> Any:
+    return value if accumulator is None or value > accumulator else accumulator
+
+
+def _merge_with(add: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    return lambda first, second: first if second is None else add(first, second)
+
+
+COUNT = Aggregator(lambda: 0, lambda count, _: count + 1, lambda a, b: a + b)
+SUM = Aggregator(lambda: 0, lambda total, value: total + value, lambda a, b: a + b)
+MIN = Aggregator(lambda: None, _min, _merge_with(_min))
+MAX = Aggregator(lambda: None, _max, _merge_with(_max))
+MEAN = Aggregator(
+    lambda: (0, 0),
+    lambda mean, value: (mean[0] + value, mean[1] + 1),
+    lambda a, b: (a[0] + b[0], a[1] + b[1]),
+    lambda mean: mean[0] / mean[1] if mean[1] else None,
+)
+
+
+class WindowKind(Enum):
+    TUMBLING = "tumbling"
+    # windows of the size which start every slide, so they overlap
+    SLIDING = "sliding"
+    # windows of activity of a key, closed after the gap without messages
+    SESSION = "session"
+
+
+@dataclass(frozen=True)
+class Window:
+    # sizes are numbers of messages of a key or time
+    kind: WindowKind
+    size: int | timedelta | None = None
+    slide: int | timedelta | None = None
+    gap: timedelta | None = None
+
+    def __post_init__(self) -> None:
+        if self.kind is WindowKind.SESSION:
+            if self.gap is None or self.gap <= timedelta(0):
+                raise ValueError("Session windows must have a positive gap")
+            return
+
+        match self.size, self.slide:
+            case int(size), int(slide):
+                positive = size > 0 and slide > 0
+                panes = size / slide if positive else 0
+            case timedelta() as size, timedelta() as slide:
+                positive = size > timedelta(0) and slide > timedelta(0)
+                panes = size / slide if positive else 0
+            case _:
+                raise ValueError("Window size and slide must be both counts or times")
+        if not positive:
+            raise ValueError("Window size and slide must be positive")
+        if panes < 1 or not panes.is_integer():
+            raise ValueError("Window size must be a multiple of the slide")
+
+    @classmethod
+    def tumbling(cls, size: int | timedelta) -> Window:
+        return cls(WindowKind.TUMBLING, size=size, slide=size)
+
+    @classmethod
+    def sliding(cls, size: int | timedelta, slide: int | timedelta) -> Window:
+        return cls(WindowKind.SLIDING, size=size, slide=slide)
+
+    @classmethod
+    def session(cls, gap: timedelta) -> Window:
+        return cls(WindowKind.SESSION, gap=gap)
+
+    @property
+    def interval(self) -> float | None:
+        # the longest time between closing windows, None for windows by count
+        step = self.gap if self.kind is WindowKind.SESSION else self.slide
+        return step.total_seconds() if isinstance(step, timedelta) else None
+
+
+@dataclass(frozen=True, slots=True)
+class WindowResult:
+    key: Hashable
+    value: Any
+    # bounds of time windows in seconds, None for windows by count
+    start: float | None = None
+    end: float | None = None
+
+
+class _WindowState(Protocol):
+    # results of the closed windows, taken by the actor
+    closed: list[WindowResult]
+
+    def add(self, key: Hashable, value: Any, now: float) -> None:
+        ...
+
+    def expire(self, now: float) -> None:
+        ...
+
+    def flush(self) -> None:
+        ...
+
+    def next_close(self) -> float | None:
+        ...
+
+
+@dataclass
+class _GlobalState:
+    # one window per key for the whole stream
+    aggregator: Aggregator
+    accumulators: dict[Hashable, Any] = field(default_factory=dict)
+    closed: list[WindowResult] = field(default_factory=list)
+
+    def add(self, key: Hashable, value: Any, now: float) -> None:
+        accumulators = self.accumulators
+        accumulator = (
+            accumulators[key] if key in accumulators else self.aggregator.create()
+        )
+        accumulators[key] = self.aggregator.add(accumulator, value)
+
+    def expire(self, now: float) -> None:
+        pass
+
+    def flush(self) -> None:
+        for key, accumulator in self.accumulators.items():
+            self.closed.append(WindowResult(key, self.aggregator.result(accumulator)))
+        self.accumulators = {}
+
+    def next_close(self) -> float | None:
+        return None
+
+
+@dataclass(slots=True)
+class _CountPanes:
+    panes: deque[Any]
+    accumulator: Any
+    count: int = 0
+
+
+@dataclass
+class _CountState:
+    # a window of a key closes after size messages of the key,
+    # sliding windows are merged from panes of slide messages
+    aggregator: Aggregator
+    size: int
+    slide: int
+    keys: dict[Hashable, _CountPanes] = field(default_factory=dict)
+    closed: list[WindowResult] = field(default_factory=list)
+
+    def add(self, key: Hashable, value: Any, now: float) -> None:
+        state = self.keys.get(key)
+        if state is None:
+            state = _CountPanes(
+                deque(maxlen=self.size // self.slide), self.aggregator.create()
+            )
+            self.keys[key] = state
+
+        state.accumulator = self.aggregator.add(state.accumulator, value)
+        state.count += 1
+        if state.count < self.slide:
+            return
+
+        state.panes.append(state.accumulator)
+        state.accumulator = self.aggregator.create()
+        state.count = 0
+        if len(state.panes) == state.panes.maxlen:
+            self._close(key, list(state.panes))
+
+    def expire(self, now: float) -> None:
+        pass
+
+    def flush(self) -> None:
+        # the last windows are closed with fewer messages
+        for key, state in self.keys.items():
+            full = len(state.panes) == state.panes.maxlen
+            if full and not state.count:
+                continue
+            panes = list(state.panes)
+            if full:
+                panes = panes[1:]
+            self._close(key, [*panes, state.accumulator] if state.count else panes)
+        self.keys = {}
+
+    def next_close(self) -> float | None:
+        return None
+
+    def _close(self, key: Hashable, panes: list[Any]) -> None:
+        accumulator = panes[0]
+        for pane in panes[1:]:
+            accumulator = self.aggregator.merge(accumulator, pane)
+        self.closed.append(WindowResult(key, self.aggregator.result(accumulator)))
+
+
+@dataclass
+class _TimeState:
+    # windows are aligned to multiples of the slide, every pane of slide seconds
+    # keeps the aggregates of its keys and windows are merged from the panes
+    aggregator: Aggregator
+    size: float
+    slide: float
+    panes: dict[float, dict[Hashable, Any]] = field(default_factory=dict)
+    # end of the next window to close, None when there are no panes
+    next_end: float | None = None
+    # end of the last closed window, messages of closed windows are late
+    closed_end: float = float("-inf")
+    late: int = 0
+    closed: list[WindowResult] = field(default_factory=list)
+
+    def add(self, key: Hashable, value: Any, now: float) -> None:
+        pane_start = now - now % self.slide
+        if pane_start + self.size <= self.closed_end:
+            self.late += 1
+            return
+
+        accumulators = self.panes.get(pane_start)
+        if accumulators is None:
+            accumulators = self.panes[pane_start] = {}
+            first_end = max(pane_start, self.closed_end) + self.slide
+            if self.next_end is None or first_end < self.next_end:
+                self.next_end = first_end
+        accumulator = (
+            accumulators[key] if key in accumulators else self.aggregator.create()
+        )
+        accumulators[key] = self.aggregator.add(accumulator, value)
+
+    def expire(self, now: float) -> None:
+        while self.next_end is not None and self.next_end <= now:
+            self._close(self.next_end)
+
+    def flush(self) -> None:
+        self.expire(float("inf"))
+
+    def next_close(self) -> float | None:
+        return self.next_end
+
+    def _close(self, end: float) -> None:
+        start = end - self.size
+        merged: dict[Hashable, Any] = {}
+        merge = self.aggregator.merge
+        for pane_start, accumulators in self.panes.items():
+            if start <= pane_start < end:
+                for key, accumulator in accumulators.items():
+                    merged[key] = (
+                        merge(merged[key], accumulator)
+                        if key in merged
+                        else accumulator
+                    )
+        result = self.aggregator.result
+        self.closed.extend(
+            WindowResult(key, result(accumulator), start, end)
+            for key, accumulator in merged.items()
+        )
+
+        # panes which are not in the next windows are dropped
+        self.closed_end = end
+        for pane_start in [p for p in self.panes if p < start + self.slide]:
+            del self.panes[pane_start]
+        self.next_end = max(end, min(self.panes)) + self.slide if self.panes else None
+
+
+@dataclass(slots=True)
+class _Session:
+    start: float
+    last: float
+    accumulator: Any
+
+
+@dataclass
+class _SessionState:
+    aggregator: Aggregator
+    gap: float
+    # ordered by the last activity, so the expired sessions are at the start
+    sessions: dict[Hashable, _Session] = field(default_factory=dict)
+    closed: list[WindowResult] = field(default_factory=list)
+
+    def add(self, key: Hashable, value: Any, now: float) -> None:
+        session = self.sessions.pop(key, None)
+        if session is not None and now - session.last >= self.gap:
+            self._close(key, session)
+            session = None
+        if session is None:
+            session = _Session(now, now, self.aggregator.create())
+        session.accumulator = self.aggregator.add(session.accumulator, value)
+        session.last = max(session.last, now)
+        self.sessions[key] = session
+
+    def expire(self, now: float) -> None:
+        expired = []
+        for key, session in self.sessions.items():
+            if now - session.last < self.gap:
+                break
+            expired.append(key)
+        for key in expired:
+            self._close(key, self.sessions.pop(key))
+
+    def flush(self) -> None:
+        for key, session in self.sessions.items():
+            self._close(key, session)
+        self.sessions = {}
+
+    def next_close(self) -> float | None:
+        for session in self.sessions.values():
+            return session.last + self.gap
+        return None
+
+    def _close(self, key: Hashable, session: _Session) -> None:
+        self.closed.append(
+            WindowResult(
+                key,
+                self.aggregator.result(session.accumulator),
+                session.start,
+                session.last + self.gap,
+            )
+        )
+
+
+def _create_state(window: Window | None, aggregator: Aggregator) -> _WindowState:
+    if window is None:
+        return _GlobalState(aggregator)
+    if window.kind is WindowKind.SESSION and window.gap is not None:
+        return _SessionState(aggregator, window.gap.total_seconds())
+    if isinstance(window.size, int) and isinstance(window.slide, int):
+        return _CountState(aggregator, window.size, window.slide)
+    if isinstance(window.size, timedelta) and isinstance(window.slide, timedelta):
+        return _TimeState(
+            aggregator, window.size.total_seconds(), window.slide.total_seconds()
+        )
+    raise ValueError(f"Unsupported window {window}")
+
+
+@dataclass
+class KeyedAggregateActor(Actor):
+    # aggregates the values of every key and sends a WindowResult per key
+    # when a window closes, or at the end of the stream without a window
+    name: str = "keyed_aggregate_actor"
+    aggregator: Aggregator = field(kw_only=True)
+    key: Callable[[Any], Hashable] = field(default=lambda data: None, kw_only=True)
+    value: Callable[[Any], Any] = field(default=lambda data: data, kw_only=True)
+    window: Window | None = field(default=None, kw_only=True)
+    # time of a message in seconds, windows are closed as the time of the
+    # messages passes, by default the current time is used
+    timestamp: Callable[[Any], float] | None = field(default=None, kw_only=True)
+    # messages are aggregated in order
+    workers: int = field(default=1, kw_only=True)
+
+    state: _WindowState = field(init=False, repr=False)
+    # held while the timer sends the windows it closed, see process_end
+    closing_lock: asyncio.Lock = field(
+        init=False, default_factory=asyncio.Lock, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        if self.workers != 1:
+            raise ValueError("Aggregate actors must have exactly one worker")
+        self.state = _create_state(self.window, self.aggregator)
+
+    async def message_loop(self) -> None:
+        interval = self.window.interval if self.window is not None else None
+        if interval is None or self.timestamp is not None:
+            await super().message_loop()
+            return
+
+        # windows by the current time close without new messages as well
+        async with asyncio.TaskGroup() as group:
+            group.create_task(self._close_expired_windows(interval))
+            await super().message_loop()
+
+    async def process_result(self, result: Any) -> Output | None:
+        self._add(result)
+        return self._closed_output()
+
+    async def process_batch(self, results: list[Any]) -> Output | None:
+        for result in results:
+            self._add(result)
+        return self._closed_output()
+
+    async def process_end(self) -> Output | None:
+        # the windows closed by the timer are sent before the end of the stream
+        async with self.closing_lock:
+            self.state.flush()
+            return self._closed_output()
+
+    def _add(self, data: Any) -> None:
+        if self.timestamp is None:
+            self.state.add(self.key(data), self.value(data), time.time())
+            return
+        # windows which end before the message are closed first
+        now = self.timestamp(data)
+        self.state.expire(now)
+        self.state.add(self.key(data), self.value(data), now)
+
+    def _closed_output(self) -> Output | None:
+        if not self.state.closed:
+            return None
+        output = Output(results=self.state.closed)
+        self.state.closed = []
+        return output
+
+    async def _close_expired_windows(self, interval: float) -> None:
+        system = self.get_system()
+        while True:
+            next_close = self.state.next_close()
+            delay = interval if next_close is None else next_close - time.time()
+            await asyncio.sleep(min(max(delay, 0), interval))
+            async with self.closing_lock:
+                self.state.expire(time.time())
+                output = self._closed_output()
+                if output is not None:
+                    await system.distribute_output(None, output, self.pool or self)
+
+
+@dataclass
+class WindowActor(KeyedAggregateActor):
+    # aggregates all messages in windows, as a single key
+    name: str = "window_actor"
+    window: Window = field(kw_only=True)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import itertools
+import os
+
+# ids are 64-bit integers: the process id in the high bits and a counter in
+# the low 42 bits, so they are unique among the processes of one machine,
+# cheap to generate and cheap to hash
+_COUNTER_BITS = 42
+
+_counter = itertools.count()
+
+
+def _reset_counter() -> None:
+    global _counter  # noqa: PLW0603
+    _counter = itertools.count((os.getpid() << _COUNTER_BITS) + 1)
+
+
+def next_id() -> int:
+    return next(_counter)
+
+
+_reset_counter()
+os.register_at_fork(after_in_child=_reset_counter)
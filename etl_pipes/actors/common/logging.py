@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import copy
+import functools
 import logging
-from datetime import datetime
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
 
 from etl_pipes.actors.common.types import Message
 
-actor_logger = logging.getLogger()
-logging.basicConfig(level=logging.INFO)
+# the application configures the handlers, nothing is configured on import
+actor_logger = logging.getLogger("etl_pipes.actors")
 
 
 def log_message(
@@ -15,19 +20,55 @@ def log_message(
     text: str,
     log_data: bool,
 ) -> None:
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if not actor_logger.isEnabledFor(level):
+        return
 
     actor_logger.log(
         level,
-        f"{current_time} [mid:%s][tid:%s][f:%s][t:%s][d:%s] %s",
-        message.trace_id,
+        "[mid:%s][tid:%s][f:%s][t:%s][d:%s] %s",
         message.id,
+        message.trace_id,
         message.sender_name or message.sender_id,
         message.receiver_name or message.receiver_id,
-        log_data and message.data or "",
+        message.data if log_data else "",
         text,
     )
 
 
 def log_message_info(message: Message, text: str, log_data: bool = False) -> None:
     log_message(logging.INFO, message, text, log_data)
+
+
+class DeferredQueueHandler(QueueHandler):
+    # QueueHandler formats records before queueing them, here only the message
+    # is built, because its arguments can be changed by the event loop later,
+    # the rest of the formatting is done by the handlers in the listener thread
+    def prepare(self, record: logging.LogRecord) -> Any:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def start_queued_logging(*handlers: logging.Handler) -> QueueListener:
+    # the handlers are called by a background thread,
+    # so formatting and writing logs does not block the event loop
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(records)
+    actor_logger.addHandler(queue_handler)
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    os.register_at_fork(
+        after_in_child=functools.partial(_log_directly, queue_handler, handlers)
+    )
+    return listener
+
+
+def _log_directly(
+    queue_handler: logging.Handler, handlers: tuple[logging.Handler, ...]
+) -> None:
+    # the listener thread is not forked, so forked processes call the handlers
+    if queue_handler in actor_logger.handlers:
+        actor_logger.removeHandler(queue_handler)
+        for handler in handlers:
+            actor_logger.addHandler(handler)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from etl_pipes.actors.common.logging import actor_logger
+from etl_pipes.actors.common.types import Message, MessageTraceId
+
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_HASH_MASK = (1 << 64) - 1
+
+
+@dataclass(slots=True)
+class TraceEvent:
+    # keeps a reference to the message, it is formatted only when it is logged
+    timestamp: float
+    action: str
+    actor_name: str
+    message: Message
+    log_data: bool
+
+    def __str__(self) -> str:
+        message = self.message
+        data = f"[d:{message.data!r}]" if self.log_data else ""
+        return (
+            f"[tid:{message.trace_id}][mid:{message.id}]"
+            f"[f:{message.sender_id}][t:{message.receiver_id}]{data} "
+            f"{self.actor_name} {self.action}"
+        )
+
+
+@dataclass
+class Tracer:
+    # the share of traces which are recorded, traces are sampled by their id,
+    # so an actor records either all events of a trace or none of them
+    sample_rate: float = 1.0
+    # sample rates by actor name, they override sample_rate
+    actor_sample_rates: dict[str, float] = field(default_factory=dict)
+    # number of recent events kept in memory
+    buffer_size: int = 1024
+    log_level: int = logging.DEBUG
+    log_data: bool = False
+
+    events: deque[TraceEvent] = field(init=False)
+    thresholds: dict[str, int] = field(init=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.events = deque(maxlen=self.buffer_size)
+
+    def is_sampled(self, trace_id: MessageTraceId | None, actor_name: str) -> bool:
+        if trace_id is None:
+            return False
+        threshold = self.thresholds.get(actor_name)
+        if threshold is None:
+            rate = self.actor_sample_rates.get(actor_name, self.sample_rate)
+            threshold = self.thresholds[actor_name] = int(rate * (_HASH_MASK + 1))
+        # multiplicative hashing spreads sequential ids evenly
+        return (trace_id * _HASH_MULTIPLIER) & _HASH_MASK < threshold
+
+    def record(self, action: str, actor_name: str, message: Message) -> None:
+        if not self.is_sampled(message.trace_id, actor_name):
+            return
+        event = TraceEvent(time.time(), action, actor_name, message, self.log_data)
+        self.events.append(event)
+        if actor_logger.isEnabledFor(self.log_level):
+            actor_logger.log(self.log_level, "%s", event)
+
+    def recent(self, trace_id: MessageTraceId | None = None) -> list[TraceEvent]:
+        return [
+            event
+            for event in self.events
+            if trace_id is None or event.message.trace_id == trace_id
+        ]
@@ -1,41 +1,58 @@
 from __future__ import annotations
 
-import uuid
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, NewType, Protocol
+from typing import TYPE_CHECKING, Any, NewType, Protocol
 
+from etl_pipes.actors.common.ids import next_id
 
-@dataclass(frozen=True)
+if TYPE_CHECKING:
+    from etl_pipes.actors.actor import Actor
+
+
+class OutputType(Enum):
+    RESULT = "result"
+    EXCEPTION = "exception"
+    # end of stream, the sender will not send anything else
+    END = "end"
+
+
+@dataclass(slots=True)
 class Message:
+    # messages are not changed after they are created,
+    # but they are not frozen, because frozen dataclasses are slower to create
     data: Any
-    trace_id: MessageTraceId = field(
-        default_factory=lambda: MessageTraceId(str(uuid.uuid4()))
-    )
-    id: MessageId = field(default_factory=lambda: MessageId(str(uuid.uuid4())))
+    # only assigned when messages are traced, see ActorSystem.tracer
+    trace_id: MessageTraceId | None = None
+    id: MessageId = field(default_factory=lambda: MessageId(next_id()))
     sender_id: ActorId | None = None
     receiver_id: ActorId | None = None
     sender_name: str | None = None
     receiver_name: str | None = None
+    # tells if the data is passed to process_result or process_exception
+    output_type: OutputType = OutputType.RESULT
+    # when set, the data is a list of items sent to the receiver at once
+    is_batch: bool = False
+    # perf_counter of inserting the first message of the trace,
+    # only assigned when metrics are collected, see ActorSystem.metrics
+    started_at: float | None = None
 
-    def copy_with_trace_and_data(self, trace_id: MessageTraceId) -> Message:
+    def copy_with_trace_and_data(self, trace_id: MessageTraceId | None) -> Message:
         return Message(
             data=self.data,
             trace_id=trace_id,
             id=self.id,
             sender_id=self.sender_id,
             receiver_id=self.receiver_id,
+            output_type=self.output_type,
+            is_batch=self.is_batch,
+            started_at=self.started_at,
         )
 
 
-MessageTraceId = NewType("MessageTraceId", str)
-MessageId = NewType("MessageId", str)
-ActorId = NewType("ActorId", str)
-
-
-class OutputType(Enum):
-    RESULT = "result"
-    EXCEPTION = "exception"
+MessageTraceId = NewType("MessageTraceId", int)
+MessageId = NewType("MessageId", int)
+ActorId = NewType("ActorId", int)
 
 
 @dataclass
@@ -51,6 +68,11 @@ class Output:
         self.exceptions.append(exception)
         return self
 
+    def merge(self, other: Output) -> Output:
+        self.results.extend(other.results)
+        self.exceptions.extend(other.exceptions)
+        return self
+
 
 class IActorSystem(Protocol):
     async def insert_result_message(
@@ -68,3 +90,34 @@ class IActorSystem(Protocol):
         to_actor: ActorId | None = None,
     ) -> None:
         ...
+
+    async def distribute_output(
+        self,
+        trace_id: MessageTraceId | None,
+        output: Output,
+        sender: Actor,
+        started_at: float | None = None,
+    ) -> None:
+        ...
+
+    async def handle_failure(
+        self, actor: Actor, message: Message, exception: Exception
+    ) -> None:
+        ...
+
+    async def dead_letter(
+        self, actor: Actor, message: Message, exception: Exception | None = None
+    ) -> None:
+        ...
+
+    def message_done(self) -> None:
+        ...
+
+    def end_input_of(self, actor: Actor) -> None:
+        ...
+
+    def add_actor(self, actor: Actor) -> None:
+        ...
+
+    async def remove_actor(self, actor: Actor) -> None:
+        ...
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import mmap
+import os
+import pickle
+import struct
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+
+from etl_pipes.actors.common.ids import next_id
+from etl_pipes.actors.common.types import Message, MessageId
+from etl_pipes.actors.mailbox import Mailbox
+
+# length and crc32 of the payload, a zero length marks the end of the written data
+RECORD_HEADER = struct.Struct("<II")
+SEGMENT_SUFFIX = ".log"
+CHECKPOINT_FILE = "checkpoint"
+
+
+@dataclass
+class _Segment:
+    # segment files are named by the offset of their first record
+    start: int
+    path: Path
+    size: int
+    file: mmap.mmap = field(init=False, repr=False)
+    position: int = 0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        with self.path.open("a+b") as f:
+            # preallocated and sparse, so the unwritten part is zeros
+            if os.fstat(f.fileno()).st_size < self.size:
+                f.truncate(self.size)
+            self.size = os.fstat(f.fileno()).st_size
+            self.file = mmap.mmap(f.fileno(), self.size)
+
+    def read(self) -> list[bytes]:
+        # records of a torn write at the end are ignored
+        payloads = []
+        while self.position + RECORD_HEADER.size <= self.size:
+            length, crc = RECORD_HEADER.unpack_from(self.file, self.position)
+            start = self.position + RECORD_HEADER.size
+            payload = self.file[start : start + length]
+            if not length or len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            payloads.append(payload)
+            self.position = start + length
+            self.count += 1
+        return payloads
+
+    def fits(self, payload: bytes) -> bool:
+        return self.position + RECORD_HEADER.size + len(payload) <= self.size
+
+    def append(self, payload: bytes) -> None:
+        # writes go to the page cache, they survive a crash of the process
+        # and are written to the disk by sync
+        RECORD_HEADER.pack_into(
+            self.file, self.position, len(payload), zlib.crc32(payload)
+        )
+        start = self.position + RECORD_HEADER.size
+        self.file[start : start + len(payload)] = payload
+        self.position = start + len(payload)
+        self.count += 1
+
+    def close(self) -> None:
+        self.file.flush()
+        self.file.close()
+
+
+@dataclass
+class SegmentLog:
+    # append-only log of records in segment files of one directory,
+    # records below the checkpoint are acknowledged and their segments deleted
+    path: Path
+    segment_size: int = 64 * 1024 * 1024
+    # the segment and the checkpoint are synced after this many appends or acks,
+    # or when the interval passes, whatever comes first
+    sync_every: int = 1000
+    sync_interval: timedelta = field(default_factory=lambda: timedelta(seconds=1))
+
+    segments: list[_Segment] = field(init=False, default_factory=list)
+    next_offset: int = field(init=False, default=0)
+    # every record below it is acknowledged
+    committed: int = field(init=False, default=0)
+    checkpointed: int = field(init=False, default=0)
+    acked: set[int] = field(init=False, default_factory=set)
+    # acknowledgements which are not in the checkpoint yet
+    dirty: bool = field(init=False, default=False)
+    unsynced: int = field(init=False, default=0)
+    synced_at: float = field(init=False, default_factory=time.monotonic)
+
+    def __post_init__(self) -> None:
+        if self.segment_size <= RECORD_HEADER.size:
+            raise ValueError("segment_size must be larger than a record header")
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def recover(self) -> list[tuple[int, bytes]]:
+        # returns the records which were not acknowledged before the restart
+        checkpoint = self.path / CHECKPOINT_FILE
+        if checkpoint.exists():
+            committed, *acked = map(int, checkpoint.read_text().split())
+            self.committed, self.acked = committed, set(acked)
+        self.checkpointed = self.committed
+
+        starts = sorted(int(p.stem) for p in self.path.glob(f"*{SEGMENT_SUFFIX}"))
+        records = []
+        for start in starts:
+            segment = _Segment(start, self._segment_path(start), self.segment_size)
+            for index, payload in enumerate(segment.read()):
+                offset = start + index
+                if offset >= self.committed and offset not in self.acked:
+                    records.append((offset, payload))
+            self.segments.append(segment)
+            self.next_offset = start + segment.count
+
+        # the log continues after the last record
+        self.next_offset = max(self.next_offset, self.committed)
+        for segment in self.segments[:-1]:
+            segment.file.close()
+        self.segments = self.segments[-1:]
+        self._delete_acknowledged_segments(starts)
+        return records
+
+    def append(self, payload: bytes) -> int:
+        if not self.segments or not self.segments[-1].fits(payload):
+            self._roll(len(payload))
+        self.segments[-1].append(payload)
+        offset = self.next_offset
+        self.next_offset += 1
+        self._maybe_sync()
+        return offset
+
+    def ack(self, offset: int) -> None:
+        # records are acknowledged out of order by concurrent workers,
+        # the checkpoint only moves past a continuous range
+        self.acked.add(offset)
+        while self.committed in self.acked:
+            self.acked.remove(self.committed)
+            self.committed += 1
+        self.dirty = True
+        self._maybe_sync()
+
+    def sync(self) -> None:
+        if self.segments:
+            self.segments[-1].file.flush()
+        if self.dirty:
+            # the acknowledged records above the checkpoint are saved as well,
+            # so the messages behind a slow one are not delivered again
+            temporary = self.path / f"{CHECKPOINT_FILE}.tmp"
+            with temporary.open("w") as f:
+                f.write(" ".join(map(str, [self.committed, *sorted(self.acked)])))
+                f.flush()
+                os.fsync(f.fileno())
+            temporary.replace(self.path / CHECKPOINT_FILE)
+            self.checkpointed = self.committed
+            self.dirty = False
+            self._delete_acknowledged_segments(
+                sorted(int(p.stem) for p in self.path.glob(f"*{SEGMENT_SUFFIX}"))
+            )
+        self.unsynced = 0
+        self.synced_at = time.monotonic()
+
+    def close(self) -> None:
+        self.sync()
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+    def _maybe_sync(self) -> None:
+        self.unsynced += 1
+        if (
+            self.unsynced >= self.sync_every
+            or time.monotonic() - self.synced_at >= self.sync_interval.total_seconds()
+        ):
+            self.sync()
+
+    def _roll(self, payload_size: int) -> None:
+        if self.segments:
+            self.segments.pop().close()
+        # a record larger than a segment gets a segment of its own size
+        size = max(self.segment_size, RECORD_HEADER.size * 2 + payload_size)
+        start = self.next_offset
+        self.segments.append(_Segment(start, self._segment_path(start), size))
+
+    def _delete_acknowledged_segments(self, starts: list[int]) -> None:
+        # a segment is acknowledged when the next one starts below the checkpoint
+        for start, next_start in itertools.pairwise(starts):
+            if next_start <= self.checkpointed:
+                self._segment_path(start).unlink(missing_ok=True)
+
+    def _segment_path(self, start: int) -> Path:
+        return self.path / f"{start:020d}{SEGMENT_SUFFIX}"
+
+
+@dataclass
+class DurableMailbox(Mailbox[Message]):
+    # messages are appended to a log before they are queued and acknowledged
+    # when they are processed, so the queued and in-flight messages are
+    # delivered again after a restart, at least once
+    path: Path = field(kw_only=True)
+    log: SegmentLog = field(init=False)
+    # offsets of the queued and in-flight messages by their ids
+    offsets: dict[MessageId, int] = field(init=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.log = SegmentLog(self.path)
+        recovered = self.log.recover()
+        # recovered messages are queued even if there are more than the capacity
+        capacity = max(self.capacity, len(recovered)) if self.capacity else 0
+        self.queue = asyncio.Queue(capacity)
+        for offset, payload in recovered:
+            message = pickle.loads(payload)
+            # ids of the previous process may be generated again by this one
+            message.id = MessageId(next_id())
+            self.offsets[message.id] = offset
+            self.queue.put_nowait(message)
+
+    async def put(self, item: Message) -> Message | None:
+        payload = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        self.offsets[item.id] = self.log.append(payload)
+        try:
+            dropped = await super().put(item)
+        except BaseException:
+            self._ack(item)
+            raise
+        if dropped is not None:
+            self._ack(dropped)
+        return dropped
+
+    def task_done(self, item: Message | None = None) -> None:
+        super().task_done(item)
+        if item is not None:
+            self._ack(item)
+
+    def close(self) -> None:
+        self.log.close()
+
+    def _ack(self, item: Message) -> None:
+        # ends of streams are not logged, they are sent again by the sources
+        offset = self.offsets.pop(item.id, None)
+        if offset is not None:
+            self.log.ack(offset)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class OverflowPolicy(Enum):
+    # wait until there is a free slot, slowing down the sender
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    ERROR = "error"
+
+
+class MailboxFullError(Exception):
+    pass
+
+
+@dataclass
+class Mailbox(Generic[T]):
+    # 0 means the mailbox is unbounded, as in asyncio.Queue
+    capacity: int = 0
+    overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK
+
+    queue: asyncio.Queue[T] = field(init=False)
+    dropped: int = field(init=False, default=0)
+
+    def __post_init__(self) -> None:
+        self.queue = asyncio.Queue(self.capacity)
+
+    async def put(self, item: T) -> T | None:
+        # returns an item which was dropped to respect the capacity, if any
+        if self.overflow_policy is OverflowPolicy.BLOCK:
+            await self.queue.put(item)
+            return None
+
+        if not self.queue.full():
+            self.queue.put_nowait(item)
+            return None
+
+        match self.overflow_policy:
+            case OverflowPolicy.DROP_NEWEST:
+                self.dropped += 1
+                return item
+            case OverflowPolicy.DROP_OLDEST:
+                oldest = self.queue.get_nowait()
+                self.queue.task_done()
+                self.queue.put_nowait(item)
+                self.dropped += 1
+                return oldest
+            case _:
+                raise MailboxFullError(f"Mailbox is full, capacity {self.capacity}")
+
+    async def get(self) -> T:
+        return await self.queue.get()
+
+    def task_done(self, item: T | None = None) -> None:
+        # the processed item is acknowledged by durable mailboxes
+        self.queue.task_done()
+
+    async def join(self) -> None:
+        # waits until every item is taken and marked as done
+        await self.queue.join()
+
+    def empty(self) -> bool:
+        return self.queue.empty()
+
+    def qsize(self) -> int:
+        return self.queue.qsize()
+
+    def close(self) -> None:
+        # durable mailboxes write their state, see DurableMailbox
+        pass
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import bisect
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import TYPE_CHECKING, Protocol
+
+from etl_pipes.actors.common.types import ActorId, Message, Output, OutputType
+
+if TYPE_CHECKING:
+    from etl_pipes.actors.actor import Actor
+
+# upper bounds of the latency buckets in seconds, the last bucket is unbounded
+LATENCY_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+)
+
+
+@dataclass(frozen=True)
+class HistogramSnapshot:
+    bounds: tuple[float, ...]
+    counts: tuple[int, ...]
+    count: int
+    total: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        # the upper bound of the bucket with the quantile, inf for the last one
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip((*self.bounds, float("inf")), self.counts):
+            seen += count
+            if count and seen >= rank:
+                return bound
+        return 0.0
+
+
+@dataclass(slots=True)
+class Histogram:
+    # buckets are allocated once, observations do not allocate
+    bounds: tuple[float, ...] = LATENCY_BUCKETS
+    counts: list[int] = field(init=False)
+    count: int = 0
+    total: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(
+            self.bounds, tuple(self.counts), self.count, self.total
+        )
+
+
+@dataclass(frozen=True)
+class ActorMetricsSnapshot:
+    name: str
+    messages_in: int
+    messages_out: int
+    exceptions: int
+    # exceptions raised by the actor, the messages are lost
+    failures: int
+    mailbox_depth: int
+    in_flight: int
+    latency: HistogramSnapshot
+
+
+@dataclass(slots=True)
+class ActorMetrics:
+    messages_in: int = 0
+    messages_out: int = 0
+    exceptions: int = 0
+    failures: int = 0
+    # time of processing a message, or a whole batch
+    latency: Histogram = field(default_factory=Histogram)
+
+    def on_processed(self, message: Message, elapsed: float) -> None:
+        if message.output_type is OutputType.END:
+            return
+        self.messages_in += len(message.data) if message.is_batch else 1
+        self.latency.observe(elapsed)
+
+    def on_output(self, output: Output) -> None:
+        self.messages_out += len(output.results) + len(output.exceptions)
+        self.exceptions += len(output.exceptions)
+
+    def snapshot(self, actor: Actor) -> ActorMetricsSnapshot:
+        return ActorMetricsSnapshot(
+            name=actor.name,
+            messages_in=self.messages_in,
+            messages_out=self.messages_out,
+            exceptions=self.exceptions,
+            failures=self.failures,
+            mailbox_depth=actor.mailbox.qsize(),
+            in_flight=actor.in_flight,
+            latency=self.latency.snapshot(),
+        )
+
+
+@dataclass(frozen=True)
+class MetricsSnapshot:
+    timestamp: float
+    actors: dict[ActorId, ActorMetricsSnapshot]
+    # messages which are queued or being processed in the system
+    pending_messages: int
+    # from inserting a message to collecting the outputs of the last actors
+    end_to_end_latency: HistogramSnapshot
+
+
+class MetricsExporter(Protocol):
+    def export(self, snapshot: MetricsSnapshot) -> None:
+        ...
+
+
+@dataclass
+class InMemoryExporter:
+    # keeps the last snapshots, the oldest are dropped
+    max_snapshots: int = 100
+    snapshots: deque[MetricsSnapshot] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.snapshots = deque(maxlen=self.max_snapshots)
+
+    def export(self, snapshot: MetricsSnapshot) -> None:
+        self.snapshots.append(snapshot)
+
+    @property
+    def last(self) -> MetricsSnapshot | None:
+        return self.snapshots[-1] if self.snapshots else None
+
+
+@dataclass
+class ActorSystemMetrics:
+    # metrics of the actors which run in the current process
+    exporter: MetricsExporter | None = None
+    export_interval: timedelta = field(default_factory=lambda: timedelta(seconds=10))
+
+    actors: dict[ActorId, ActorMetrics] = field(init=False, default_factory=dict)
+    end_to_end_latency: Histogram = field(init=False, default_factory=Histogram)
+
+    def register(self, actor: Actor) -> None:
+        actor.metrics = self.actors[actor.id] = ActorMetrics()
+
+    def unregister(self, actor: Actor) -> None:
+        self.actors.pop(actor.id, None)
+
+    def on_collected(self, message: Message) -> None:
+        if message.started_at is not None:
+            self.end_to_end_latency.observe(time.perf_counter() - message.started_at)
+
+    def snapshot(
+        self, actors: dict[ActorId, Actor], pending_messages: int
+    ) -> MetricsSnapshot:
+        return MetricsSnapshot(
+            timestamp=time.time(),
+            actors={
+                actor_id: metrics.snapshot(actors[actor_id])
+                for actor_id, metrics in self.actors.items()
+            },
+            pending_messages=pending_messages,
+            end_to_end_latency=self.end_to_end_latency.snapshot(),
+        )
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import pickle
+import struct
+from dataclasses import dataclass, field
+from multiprocessing.process import BaseProcess
+from multiprocessing.sharedctypes import Synchronized
+from multiprocessing.synchronize import Event as EventType
+from typing import TYPE_CHECKING, cast
+
+from etl_pipes.actors.common.logging import actor_logger
+from etl_pipes.actors.common.types import Message
+
+if TYPE_CHECKING:
+    from etl_pipes.actors.actor import Actor
+    from etl_pipes.actors.actor_system import ActorSystem
+
+# None is the main process, numbers are worker processes, see Actor.process
+Node = int | None
+
+# messages waiting to be sent to another process, bounds memory per connection
+OUTBOX_CAPACITY = 1024
+IDLE_POLL_INTERVAL = 0.005
+# length of the pickled payload which precedes it in a pipe
+_HEADER = struct.Struct("!Q")
+
+
+@dataclass
+class _Outbox:
+    writer: asyncio.StreamWriter
+    queue: asyncio.Queue[Message] = field(
+        default_factory=lambda: asyncio.Queue(OUTBOX_CAPACITY)
+    )
+
+    async def send_loop(self) -> None:
+        while True:
+            # everything queued meanwhile is sent at once, in one pickle
+            messages = [await self.queue.get()]
+            while not self.queue.empty():
+                messages.append(self.queue.get_nowait())
+            payload = pickle.dumps(messages, protocol=pickle.HIGHEST_PROTOCOL)
+            self.writer.write(_HEADER.pack(len(payload)))
+            self.writer.write(payload)
+            await self.writer.drain()
+
+
+@dataclass
+class ProcessCluster:
+    # runs the actors placed on worker processes, every process has its own
+    # event loop and messages are passed between them over pipes
+    system: ActorSystem
+    nodes: list[Node]
+    # one-way pipes between every pair of nodes, (reader, writer) by (from, to)
+    pipes: dict[tuple[Node, Node], tuple[int, int]]
+    # messages which are queued, sent or processed in any process
+    pending: Synchronized[int]
+    # set by any process which lost messages, see _read
+    failed: EventType
+
+    node: Node = None
+    processes: list[BaseProcess] = field(default_factory=list)
+    outboxes: dict[Node, _Outbox] = field(default_factory=dict)
+    tasks: list[asyncio.Task[None]] = field(default_factory=list)
+    transports: list[asyncio.BaseTransport] = field(default_factory=list)
+
+    @classmethod
+    async def start(cls, system: ActorSystem) -> ProcessCluster:
+        # fork shares the actors with the workers without pickling them,
+        # so only the messages have to be picklable, the cluster runs no threads
+        # and the thread pools are recreated in the workers, see register_at_fork
+        context = multiprocessing.get_context("fork")
+        workers = sorted(
+            {actor.process for actor in system.actors if actor.process is not None}
+        )
+        nodes: list[Node] = [None, *workers]
+        cluster = cls(
+            system=system,
+            nodes=nodes,
+            pipes={
+                (sender, receiver): os.pipe()
+                for sender in nodes
+                for receiver in nodes
+                if sender != receiver
+            },
+            pending=cast(
+                "Synchronized[int]", context.Value("q", system.pending_messages)
+            ),
+            failed=context.Event(),
+        )
+        system.cluster = cluster
+        # pending messages are counted by the cluster from now on
+        system.idle_event.set()
+
+        for worker in workers:
+            process = context.Process(
+                target=cluster._run_worker, args=(worker,), daemon=True
+            )
+            process.start()
+            cluster.processes.append(process)
+
+        await cluster._connect()
+        return cluster
+
+    def _run_worker(self, node: int) -> None:
+        self.node = node
+        self.system.node = node
+        self.system.process_tasks = set()
+        asyncio.run(self._serve())
+
+    async def _serve(self) -> None:
+        await self._connect()
+        self.system.start_actors()
+        await asyncio.Event().wait()
+
+    async def _connect(self) -> None:
+        # every process keeps only its own ends of the pipes, so readers get
+        # EOF when the process on the other side exits
+        loop = asyncio.get_running_loop()
+        readers: list[asyncio.StreamReader] = []
+        for (sender, receiver), (reader_fd, writer_fd) in self.pipes.items():
+            if sender == self.node:
+                os.close(reader_fd)
+                transport, protocol = await loop.connect_write_pipe(
+                    asyncio.streams.FlowControlMixin, os.fdopen(writer_fd, "wb")
+                )
+                self.transports.append(transport)
+                outbox = _Outbox(asyncio.StreamWriter(transport, protocol, None, loop))
+                self.outboxes[receiver] = outbox
+                self.tasks.append(asyncio.create_task(outbox.send_loop()))
+            elif receiver == self.node:
+                os.close(writer_fd)
+                reader = asyncio.StreamReader()
+                read_transport, _ = await loop.connect_read_pipe(
+                    functools.partial(asyncio.StreamReaderProtocol, reader),
+                    os.fdopen(reader_fd, "rb"),
+                )
+                self.transports.append(read_transport)
+                readers.append(reader)
+            else:
+                os.close(reader_fd)
+                os.close(writer_fd)
+
+        # messages are read only after the connecting awaits, so the workers
+        # start their actors and mailboxes before receiving them, see _serve
+        for reader in readers:
+            self.tasks.append(asyncio.create_task(self._read(reader)))
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            try:
+                header = await reader.readexactly(_HEADER.size)
+                payload = await reader.readexactly(_HEADER.unpack(header)[0])
+            except asyncio.IncompleteReadError:
+                # the process on the other side exited
+                return
+            try:
+                # waiting for the delivery passes backpressure to the sender
+                await self.system.receive(pickle.loads(payload))
+            except Exception:
+                actor_logger.exception("Failed to receive messages from a process")
+                self._fail()
+                return
+
+    def _fail(self) -> None:
+        # pending messages of the lost delivery would never be done,
+        # so the processes stop waiting for them and the system is killed
+        self.failed.set()
+        self.system.kill()
+
+    async def send(self, node: Node, message: Message) -> None:
+        await self.outboxes[node].queue.put(message)
+
+    async def forward(self, actor: Actor) -> None:
+        while True:
+            message = await actor.mailbox.get()
+            await self.send(actor.process, message)
+            actor.mailbox.task_done(message)
+
+    def add_pending(self, count: int) -> None:
+        with self.pending.get_lock():
+            self.pending.value += count
+
+    async def wait_until_idle(self) -> None:
+        while self.pending.value:
+            if self.failed.is_set():
+                raise RuntimeError("Messages between the processes were lost")
+            await asyncio.sleep(IDLE_POLL_INTERVAL)
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        for transport in self.transports:
+            transport.close()
+
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            # polled, so no thread is started to wait for the process
+            while process.is_alive():
+                await asyncio.sleep(IDLE_POLL_INTERVAL)
+            process.join()
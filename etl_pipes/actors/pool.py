@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.common.types import Message, OutputType
+
+# points of every member on the consistent hash ring,
+# more points spread the keys more evenly
+RING_POINTS_PER_MEMBER = 64
+
+
+class RoutingStrategy(Enum):
+    ROUND_ROBIN = "round_robin"
+    # the member with the fewest queued and processed messages,
+    # only members in the process of the sender are measured correctly
+    LEAST_LOADED = "least_loaded"
+    # messages with the same key always go to the same member,
+    # resizing moves only a small part of the keys
+    CONSISTENT_HASH = "consistent_hash"
+
+
+@dataclass
+class Pool(Actor):
+    # a node of the graph which distributes messages among its members,
+    # the members send their outputs on behalf of the pool
+    name: str = "pool"
+    actor_factory: Callable[[], Actor] = field(kw_only=True)
+    size: int = field(default=1, kw_only=True)
+    strategy: RoutingStrategy = field(default=RoutingStrategy.ROUND_ROBIN, kw_only=True)
+    # key of the message data for the consistent hash strategy
+    key: Callable[[Any], Hashable] = field(default=lambda data: data, kw_only=True)
+
+    members: list[Actor] = field(init=False, default_factory=list)
+    next_member: int = field(init=False, default=0)
+    ring: list[tuple[int, int]] = field(init=False, default_factory=list)
+    retiring: set[asyncio.Task[None]] = field(init=False, default_factory=set)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        if self.size < 1:
+            raise ValueError("Pool must have at least one member")
+
+        for _ in range(self.size):
+            self.members.append(self._create_member())
+        self._build_ring()
+
+    def _create_member(self) -> Actor:
+        member = self.actor_factory()
+        member.pool = self
+        return member
+
+    def _build_ring(self) -> None:
+        self.ring = sorted(
+            (hash((member.id, point)), index)
+            for index, member in enumerate(self.members)
+            for point in range(RING_POINTS_PER_MEMBER)
+        )
+
+    def resize(self, size: int) -> None:
+        if size < 1:
+            raise ValueError("Pool must have at least one member")
+
+        system = self.get_system()
+        while len(self.members) < size:
+            member = self._create_member()
+            self.members.append(member)
+            system.add_actor(member)
+
+        while len(self.members) > size:
+            member = self.members.pop()
+            # removed members are not routed to and stop when their mailbox is empty
+            task = asyncio.create_task(self._retire(member))
+            self.retiring.add(task)
+            task.add_done_callback(self.retiring.discard)
+
+        self.size = size
+        self.next_member %= size
+        self._build_ring()
+
+    async def _retire(self, member: Actor) -> None:
+        await member.mailbox.join()
+        await self.get_system().remove_actor(member)
+
+    def processes_batches(self, output_type: OutputType) -> bool:
+        # the members are created by the same factory
+        return self.members[0].processes_batches(output_type)
+
+    def route(self, message: Message) -> list[tuple[Message, Actor]]:
+        if message.output_type is OutputType.END:
+            # every member ends its stream on behalf of the pool
+            return [(self._share(message, [None]), member) for member in self.members]
+        if not message.is_batch:
+            return [(message, self._choose(message.data))]
+
+        # batches are split, so all members get a share of the work
+        items: list[Any] = message.data
+        if self.strategy is RoutingStrategy.CONSISTENT_HASH:
+            shares: dict[int, list[Any]] = {}
+            for item in items:
+                shares.setdefault(self._lookup(item), []).append(item)
+            return [
+                (self._share(message, share), self.members[index])
+                for index, share in shares.items()
+            ]
+
+        count = min(len(self.members), len(items))
+        if self.strategy is RoutingStrategy.LEAST_LOADED:
+            members = sorted(self.members, key=self._load)[:count]
+        else:
+            members = [self._next() for _ in range(count)]
+        chunk_size = -(-len(items) // count)
+        return [
+            (self._share(message, items[start : start + chunk_size]), member)
+            for member, start in zip(members, range(0, len(items), chunk_size))
+        ]
+
+    def _choose(self, data: Any) -> Actor:
+        match self.strategy:
+            case RoutingStrategy.ROUND_ROBIN:
+                return self._next()
+            case RoutingStrategy.LEAST_LOADED:
+                return min(self.members, key=self._load)
+            case RoutingStrategy.CONSISTENT_HASH:
+                return self.members[self._lookup(data)]
+
+    def _next(self) -> Actor:
+        member = self.members[self.next_member]
+        self.next_member = (self.next_member + 1) % len(self.members)
+        return member
+
+    def _lookup(self, data: Any) -> int:
+        position = bisect.bisect(self.ring, (hash(self.key(data)),))
+        return self.ring[position % len(self.ring)][1]
+
+    @staticmethod
+    def _load(member: Actor) -> int:
+        return member.mailbox.qsize() + member.in_flight
+
+    @staticmethod
+    def _share(message: Message, items: list[Any]) -> Message:
+        return Message(
+            data=items if len(items) > 1 else items[0],
+            trace_id=message.trace_id,
+            sender_id=message.sender_id,
+            output_type=message.output_type,
+            is_batch=len(items) > 1,
+            started_at=message.started_at,
+        )
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from enum import Enum
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.common.logging import actor_logger
+from etl_pipes.actors.common.types import ActorId, Message
+from etl_pipes.actors.pool import Pool
+
+
+class RestartStrategy(Enum):
+    # only the failed actor is restarted
+    ONE_FOR_ONE = "one_for_one"
+    # all supervised actors are restarted, for actors which share state
+    ALL_FOR_ONE = "all_for_one"
+
+
+@dataclass(frozen=True)
+class DeadLetter:
+    actor_name: str
+    message: Message
+    # None when the message was not processed, because the actor was stopped
+    exception: Exception | None = None
+
+
+@dataclass
+class Supervisor:
+    # restarts actors whose process_result raised, the failed message itself
+    # is sent to the dead letters of the actor system, see ActorSystem.dead_letters,
+    # a restart only calls Actor.on_restart, which resets nothing by default
+    actors: list[Actor]
+    strategy: RestartStrategy = RestartStrategy.ONE_FOR_ONE
+    # when an actor is restarted more often, it is stopped instead,
+    # stopped actors send their messages to the dead letters
+    max_restarts: int = 3
+    within: timedelta = field(default_factory=lambda: timedelta(seconds=60))
+
+    # times of the last restarts of every actor, or of all actors for all-for-one
+    restarts: dict[ActorId | None, deque[float]] = field(
+        init=False, default_factory=dict
+    )
+
+    def __post_init__(self) -> None:
+        if self.max_restarts < 0:
+            raise ValueError("max_restarts must not be negative")
+
+    def supervises(self, actor: Actor) -> Actor | None:
+        # members of a supervised pool are supervised as the pool
+        for child in self.actors:
+            if child is actor or child is actor.pool:
+                return child
+        return None
+
+    async def handle_failure(self, child: Actor) -> None:
+        children = (
+            self.actors if self.strategy is RestartStrategy.ALL_FOR_ONE else [child]
+        )
+        key = None if self.strategy is RestartStrategy.ALL_FOR_ONE else child.id
+        if not self._allow_restart(key):
+            actor_logger.error(
+                "%s restarted too often, stopping %s",
+                child.name,
+                ", ".join(actor.name for actor in children),
+            )
+            for actor in self._expand(children):
+                actor.stopped = True
+            return
+
+        for actor in self._expand(children):
+            if not actor.stopped:
+                # the other workers of the actor keep processing meanwhile
+                await actor.on_restart()
+
+    def _allow_restart(self, key: ActorId | None) -> bool:
+        restarts = self.restarts.setdefault(key, deque(maxlen=self.max_restarts))
+        now = time.monotonic()
+        if len(restarts) == self.max_restarts and (
+            not restarts or now - restarts[0] < self.within.total_seconds()
+        ):
+            return False
+        restarts.append(now)
+        return True
+
+    @staticmethod
+    def _expand(children: list[Actor]) -> list[Actor]:
+        return [
+            actor
+            for child in children
+            for actor in (child.members if isinstance(child, Pool) else [child])
+        ]
@@ -1,21 +1,45 @@
+from __future__ import annotations
+
+from collections.abc import Callable
 from dataclasses import dataclass, fields
+from operator import attrgetter
 from typing import Any
+from weakref import WeakKeyDictionary
 
 
 class Context:
-    def has_part(self, part_name: str, part_type: type) -> bool:
-        # assume all the children of Context are dataclasses
-        for dc_field in fields(self):  # type: ignore
-            if dc_field.name == part_name and dc_field.type == part_type:
-                return True
+    @classmethod
+    def parts(cls) -> dict[str, tuple[Any, Callable[[Context], Any]]]:
+        return _parts_of(cls)
 
-        return False
+    def has_part(self, part_name: str, part_type: type) -> bool:
+        part = self.parts().get(part_name)
+        return part is not None and part[0] == part_type
 
     def get_part(self, part_name: str) -> Any:
+        part = self.parts().get(part_name)
+        if part is not None:
+            return part[1](self)
+
+
+# type and accessor of every part by its name, built once per class,
+# weak keys let classes created at runtime be freed
+_context_parts: WeakKeyDictionary[
+    type[Context], dict[str, tuple[Any, Callable[[Context], Any]]]
+] = WeakKeyDictionary()
+
+
+def _parts_of(
+    context_class: type[Context],
+) -> dict[str, tuple[Any, Callable[[Context], Any]]]:
+    parts = _context_parts.get(context_class)
+    if parts is None:
         # assume all the children of Context are dataclasses
-        for dc_field in fields(self):  # type: ignore
-            if dc_field.name == part_name:
-                return getattr(self, part_name)
+        parts = _context_parts[context_class] = {
+            dc_field.name: (dc_field.type, attrgetter(dc_field.name))
+            for dc_field in fields(context_class)  # type: ignore
+        }
+    return parts
 
 
 @dataclass(frozen=True)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from collections.abc import Callable
-from typing import Any
+from typing import Any, Literal
 
 AnyFunc = Callable[..., Any]
+ExecutorKind = Literal["thread", "process"]
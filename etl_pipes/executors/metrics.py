@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class PoolMetrics:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    def on_submit(self, tasks: int = 1) -> None:
+        self.submitted += tasks
+        self.in_flight += tasks
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def on_done(self, failed: bool, tasks: int = 1) -> None:
+        self.in_flight -= tasks
+        if failed:
+            self.failed += tasks
+        else:
+            self.completed += tasks
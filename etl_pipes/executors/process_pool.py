@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from etl_pipes.domain.types import AnyFunc
+from etl_pipes.executors.metrics import PoolMetrics
+
+
+@dataclass(frozen=True)
+class FunctionRef:
+    # functions decorated with as_pipe can't be pickled by themselves,
+    # because their module attribute is the pipe, not the function,
+    # so workers import them by name and unwrap the pipe
+    module: str
+    qualname: str
+
+    def resolve(self) -> AnyFunc:
+        target: Any = importlib.import_module(self.module)
+        for name in self.qualname.split("."):
+            target = getattr(target, name)
+        get_callable = getattr(target, "get_callable", None)
+        if get_callable is not None:
+            target = get_callable()
+        return target  # type: ignore[no-any-return]
+
+
+Target = AnyFunc | FunctionRef
+
+_targets: WeakKeyDictionary[AnyFunc, Target] = WeakKeyDictionary()
+
+
+def to_target(func: AnyFunc) -> Target:
+    try:
+        return _targets[func]
+    except (KeyError, TypeError):
+        pass
+
+    target: Target = func
+    module = getattr(func, "__module__", None)
+    qualname = getattr(func, "__qualname__", None)
+    if module and qualname and "<locals>" not in qualname:
+        ref = FunctionRef(module, qualname)
+        try:
+            if ref.resolve() is func:
+                target = ref
+        except (ImportError, AttributeError):
+            pass
+
+    try:
+        _targets[func] = target
+    except TypeError:
+        pass
+    return target
+
+
+@cache
+def _resolve(ref: FunctionRef) -> AnyFunc:
+    return ref.resolve()
+
+
+def _call(target: Target, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+    func = _resolve(target) if isinstance(target, FunctionRef) else target
+    return func(*args, **kwargs)
+
+
+def _call_chunk(target: Target, chunk: list[tuple[Any, ...]]) -> list[Any]:
+    func = _resolve(target) if isinstance(target, FunctionRef) else target
+    return [func(*args) for args in chunk]
+
+
+@dataclass
+class ProcessPool:
+    max_workers: int | None = None
+    # how many calls are sent to a worker at once by map
+    chunksize: int = 64
+
+    metrics: PoolMetrics = field(init=False, default_factory=PoolMetrics)
+    _executor: ProcessPoolExecutor | None = field(init=False, default=None, repr=False)
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # created lazily, workers are reused between pipeline calls
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def run(self, func: AnyFunc, *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        self.metrics.on_submit()
+        failed = True
+        try:
+            result = await loop.run_in_executor(
+                self.executor, _call, to_target(func), args, kwargs
+            )
+            failed = False
+            return result
+        finally:
+            self.metrics.on_done(failed)
+
+    async def map(
+        self,
+        func: AnyFunc,
+        iterable: Iterable[Any],
+        chunksize: int | None = None,
+        unpack: bool = False,
+    ) -> list[Any]:
+        chunksize = chunksize or self.chunksize
+        target = to_target(func)
+        loop = asyncio.get_running_loop()
+
+        chunks: list[list[tuple[Any, ...]]] = []
+        chunk: list[tuple[Any, ...]] = []
+        for item in iterable:
+            chunk.append(item if unpack else (item,))
+            if len(chunk) == chunksize:
+                chunks.append(chunk)
+                chunk = []
+        if chunk:
+            chunks.append(chunk)
+
+        self.metrics.on_submit(len(chunks))
+        failed = True
+        try:
+            mapped_chunks = await asyncio.gather(
+                *(
+                    loop.run_in_executor(self.executor, _call_chunk, target, chunk)
+                    for chunk in chunks
+                )
+            )
+            failed = False
+        finally:
+            self.metrics.on_done(failed, len(chunks))
+
+        return [result for mapped_chunk in mapped_chunks for result in mapped_chunk]
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_process_pool = ProcessPool()
+
+
+def get_process_pool() -> ProcessPool:
+    return _process_pool
+
+
+def configure_process_pool(
+    max_workers: int | None = None, chunksize: int = 64
+) -> ProcessPool:
+    global _process_pool  # noqa: PLW0603
+
+    _process_pool.shutdown(wait=False)
+    _process_pool = ProcessPool(max_workers=max_workers, chunksize=chunksize)
+    return _process_pool
+
+
+def _forget_executor() -> None:
+    # the workers belong to the parent, a forked process creates its own executor
+    _process_pool._executor = None
+
+
+os.register_at_fork(after_in_child=_forget_executor)
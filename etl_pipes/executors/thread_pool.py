@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from etl_pipes.domain.types import AnyFunc
+from etl_pipes.executors.metrics import PoolMetrics
+
+
+@dataclass
+class ThreadPool:
+    max_workers: int | None = None
+    thread_name_prefix: str = "etl-pipes"
+
+    metrics: PoolMetrics = field(init=False, default_factory=PoolMetrics)
+    _executor: ThreadPoolExecutor | None = field(init=False, default=None, repr=False)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # created lazily, so importing the library does not spawn threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=self.thread_name_prefix,
+            )
+        return self._executor
+
+    async def run(self, func: AnyFunc, *args: Any, **kwargs: Any) -> Any:
+        if kwargs:
+            func = functools.partial(func, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        self.metrics.on_submit()
+        failed = True
+        try:
+            result = await loop.run_in_executor(self.executor, func, *args)
+            failed = False
+            return result
+        finally:
+            self.metrics.on_done(failed)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_thread_pool = ThreadPool()
+
+
+def get_thread_pool() -> ThreadPool:
+    return _thread_pool
+
+
+def configure_thread_pool(
+    max_workers: int | None = None, thread_name_prefix: str = "etl-pipes"
+) -> ThreadPool:
+    global _thread_pool  # noqa: PLW0603
+
+    # running tasks are not interrupted, the old pool finishes them in background
+    _thread_pool.shutdown(wait=False)
+    _thread_pool = ThreadPool(
+        max_workers=max_workers, thread_name_prefix=thread_name_prefix
+    )
+    return _thread_pool
+
+
+def _forget_executor() -> None:
+    # threads are not forked, a forked process creates its own executor
+    _thread_pool._executor = None
+
+
+os.register_at_fork(after_in_child=_forget_executor)
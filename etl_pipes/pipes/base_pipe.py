@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import inspect
+from collections.abc import Callable
 from dataclasses import dataclass, field, fields
-from typing import Any, assert_never
+from typing import Any, assert_never, overload
+from weakref import WeakKeyDictionary
 
 from etl_pipes.context import Context, ContextPart
-from etl_pipes.domain.types import AnyFunc
+from etl_pipes.domain.types import AnyFunc, ExecutorKind
+from etl_pipes.executors.process_pool import get_process_pool
+from etl_pipes.executors.thread_pool import get_thread_pool
 
 
 @dataclass
@@ -18,6 +22,8 @@ class PipeOutput:
 class Pipe:
     f: AnyFunc | None = field(init=False, default=None)
     out: PipeOutput = field(init=False, default_factory=PipeOutput)
+    # where synchronous functions are run, None means directly on the event loop
+    executor: ExecutorKind | None = field(init=False, default=None)
 
     __original_func: AnyFunc | None = field(init=False, default=None)
 
@@ -32,22 +38,14 @@ class Pipe:
         if context is None:
             return
 
-        context_class = context.__class__
-        for dc_field in fields(self):
-            f_name, f_type, f_default = dc_field.name, dc_field.type, dc_field.default
+        for f_name, accessor in _injection_plan(self.__class__, context.__class__):
+            setattr(self, f_name, accessor(context))
+        for child in self.children():
+            child.apply_context(context)
 
-            # we check default, because it is being returned by full
-            # that's an indicator of applied full context
-            if f_type == context_class and f_default == context_class:
-                setattr(self, f_name, context)
-                return
-
-            # assume that it's context part
-            if isinstance(f_default, ContextPart):
-                if context.has_part(f_name, f_type):
-                    context_part = f_default
-                    if context_part.is_part_of(context_class):
-                        setattr(self, f_name, context.get_part(f_name))
+    def children(self) -> list[Pipe]:
+        # nested pipes, they get the context of their parent
+        return []
 
     @property
     def func(self) -> AnyFunc | None:
@@ -58,9 +56,27 @@ class Pipe:
         self.__original_func = func
 
         if not inspect.iscoroutinefunction(func):
+            match self.executor:
+                case None:
+
+                    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                        return func(*args, **kwargs)
+
+                case "thread":
+
+                    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                        # the pool is looked up on every call,
+                        # so it can be reconfigured after the pipe is created
+                        return await get_thread_pool().run(func, *args, **kwargs)
 
-            async def wrapper(*args: Any, **kwargs: Any) -> Any:
-                return func(*args, **kwargs)
+                case "process":
+
+                    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                        # function and arguments must be picklable
+                        return await get_process_pool().run(func, *args, **kwargs)
+
+                case _:
+                    assert_never(self.executor)
 
             self.f = wrapper
             return
@@ -89,13 +105,95 @@ class Pipe:
 
     def shallow_copy(self) -> Pipe:
         pipe = Pipe()
+        pipe.executor = self.executor
         pipe.func = self.func
         pipe.out = self.out
         return pipe
 
 
+# name, type and default of the fields set by full or single, built once per class
+_pipe_context_fields: WeakKeyDictionary[
+    type[Pipe], tuple[tuple[str, Any, Any], ...]
+] = WeakKeyDictionary()
+
+
+def _context_fields(pipe_class: type[Pipe]) -> tuple[tuple[str, Any, Any], ...]:
+    context_fields = _pipe_context_fields.get(pipe_class)
+    if context_fields is None:
+        # the other fields never get the context
+        context_fields = _pipe_context_fields[pipe_class] = tuple(
+            (dc_field.name, dc_field.type, dc_field.default)
+            for dc_field in fields(pipe_class)
+            if isinstance(dc_field.default, ContextPart)
+            or (
+                isinstance(dc_field.default, type)
+                and issubclass(dc_field.default, Context)
+            )
+        )
+    return context_fields
+
+
+# fields of a pipe class set from a context class and their accessors,
+# by pipe class and then by context class, tuples of classes can't be weak keys
+_injection_plans: WeakKeyDictionary[
+    type[Pipe],
+    WeakKeyDictionary[type[Context], tuple[tuple[str, Callable[[Context], Any]], ...]],
+] = WeakKeyDictionary()
+
+
+def _injection_plan(
+    pipe_class: type[Pipe], context_class: type[Context]
+) -> tuple[tuple[str, Callable[[Context], Any]], ...]:
+    plans = _injection_plans.get(pipe_class)
+    if plans is None:
+        plans = _injection_plans[pipe_class] = WeakKeyDictionary()
+    plan = plans.get(context_class)
+    if plan is not None:
+        return plan
+
+    targets: list[tuple[str, Callable[[Context], Any]]] = []
+    parts = context_class.parts()
+    for f_name, f_type, f_default in _context_fields(pipe_class):
+        # we check default, because it is being returned by full
+        # that's an indicator of applied full context
+        if f_type == context_class and f_default == context_class:
+            targets.append((f_name, _whole_context))
+            break
+
+        # assume that it's context part
+        if isinstance(f_default, ContextPart) and f_default.is_part_of(context_class):
+            part = parts.get(f_name)
+            if part is not None and part[0] == f_type:
+                targets.append((f_name, part[1]))
+
+    plan = plans[context_class] = tuple(targets)
+    return plan
+
+
+def _whole_context(context: Context) -> Context:
+    return context
+
+
+@overload
 def as_pipe(func: AnyFunc) -> Pipe:
-    pipe = Pipe()
-    pipe.func = func
+    ...
+
+
+@overload
+def as_pipe(*, executor: ExecutorKind | None = None) -> Callable[[AnyFunc], Pipe]:
+    ...
+
+
+def as_pipe(
+    func: AnyFunc | None = None, *, executor: ExecutorKind | None = None
+) -> Pipe | Callable[[AnyFunc], Pipe]:
+    def wrap(func: AnyFunc) -> Pipe:
+        pipe = Pipe()
+        pipe.executor = executor
+        pipe.func = func
+
+        return pipe
 
-    return pipe
+    if func is None:
+        return wrap
+    return wrap(func)
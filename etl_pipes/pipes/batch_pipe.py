@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+
+from etl_pipes.pipes.base_pipe import Pipe
+
+
+class BatchResultsMismatchError(Exception):
+    def __init__(self, items_count: int, results_count: int) -> None:
+        self.items_count = items_count
+        self.results_count = results_count
+        super().__init__(
+            f"Batch of {items_count} items produced {results_count} results"
+        )
+
+
+@dataclass
+class _PendingItem:
+    item: Any
+    future: asyncio.Future[Any]
+
+
+@dataclass
+class BatchPipe(Pipe, ABC):
+    # keyword-only, so subclasses can declare fields without defaults
+    max_batch_size: int = field(default=100, kw_only=True)
+    max_linger: timedelta = field(
+        default_factory=lambda: timedelta(milliseconds=5), kw_only=True
+    )
+
+    _batch: list[_PendingItem] = field(init=False, default_factory=list, repr=False)
+    _linger_handle: asyncio.TimerHandle | None = field(
+        init=False, default=None, repr=False
+    )
+    _flushes: set[asyncio.Task[None]] = field(
+        init=False, default_factory=set, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.max_batch_size < 1:
+            raise ValueError("max_batch_size must be positive")
+
+    async def __call__(self, *args: Any) -> Any:
+        # calls with several arguments are batched as tuples
+        item = args[0] if len(args) == 1 else args
+
+        loop = asyncio.get_running_loop()
+        pending = _PendingItem(item=item, future=loop.create_future())
+        self._batch.append(pending)
+
+        if len(self._batch) >= self.max_batch_size:
+            self._flush()
+        elif self._linger_handle is None:
+            self._linger_handle = loop.call_later(
+                self.max_linger.total_seconds(), self._flush
+            )
+
+        return await pending.future
+
+    @abstractmethod
+    async def process_batch(self, items: list[Any]) -> list[Any]:
+        # must return one result per item, in the same order
+        ...
+
+    def _flush(self) -> None:
+        if self._linger_handle is not None:
+            self._linger_handle.cancel()
+            self._linger_handle = None
+
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._process(batch))
+        # keep a reference, otherwise the task can be garbage collected
+        self._flushes.add(task)
+        task.add_done_callback(functools.partial(self._flushed, batch))
+
+    def _flushed(self, batch: list[_PendingItem], task: asyncio.Task[None]) -> None:
+        self._flushes.discard(task)
+        # a flush cancelled e.g. at shutdown must not leave its callers waiting
+        for pending in batch:
+            if not pending.future.done():
+                pending.future.cancel()
+
+    async def _process(self, batch: list[_PendingItem]) -> None:
+        try:
+            results = await self.process_batch([pending.item for pending in batch])
+            if len(results) != len(batch):
+                raise BatchResultsMismatchError(len(batch), len(results))
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        for pending, result in zip(batch, results):
+            # the caller could have been cancelled while waiting
+            if not pending.future.done():
+                pending.future.set_result(result)
@@ -1,4 +1,3 @@
-import asyncio
 from dataclasses import dataclass
 from typing import Any
 
@@ -8,6 +7,4 @@ from etl_pipes.pipes.parallel import Parallel
 @dataclass
 class BroadcastParallel(Parallel):
     async def __call__(self, *args: Any) -> tuple[Any, ...]:
-        tasks = self._create_tasks(*args)
-        results = await asyncio.gather(*tasks)
-        return tuple(results)
+        return await self._run([(pipe, args) for pipe in self.pipes])
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+
+from etl_pipes.domain.types import AnyFunc
+from etl_pipes.pipes.base_pipe import Pipe
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    # calls which joined an identical call already in progress
+    coalesced: int = 0
+    evictions: int = 0
+    # calls with unhashable arguments, passed to the pipe as is
+    uncacheable: int = 0
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float | None
+
+
+@dataclass
+class Cached(Pipe):
+    pipe: Pipe
+    # None means the cache is unbounded
+    maxsize: int | None = field(default=128)
+    ttl: timedelta | None = field(default=None)
+
+    stats: CacheStats = field(init=False, default_factory=CacheStats)
+    _entries: OrderedDict[Hashable, _Entry] = field(
+        init=False, default_factory=OrderedDict, repr=False
+    )
+    _in_flight: dict[Hashable, asyncio.Task[Any]] = field(
+        init=False, default_factory=dict, repr=False
+    )
+
+    def children(self) -> list[Pipe]:
+        return [self.pipe]
+
+    async def __call__(self, *args: Any) -> Any:
+        key = _make_key(args)
+        try:
+            entry = self._entries.get(key)
+        except TypeError:
+            self.stats.uncacheable += 1
+            return await self.pipe(*args)
+
+        if entry is not None:
+            if entry.expires_at is None or entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry.value
+            del self._entries[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.stats.misses += 1
+            task = asyncio.create_task(self._load(key, args))
+            # all callers can be cancelled before the load fails
+            task.add_done_callback(_retrieve_exception)
+            self._in_flight[key] = task
+        else:
+            self.stats.coalesced += 1
+
+        # the load is shared, cancelling one caller must not cancel it for others
+        return await asyncio.shield(task)
+
+    def invalidate(self, *args: Any) -> None:
+        self._entries.pop(_make_key(args), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_callable(self) -> AnyFunc:
+        # validate pipelines against the signature of the cached pipe
+        return self.pipe.get_callable()
+
+    async def _load(self, key: Hashable, args: tuple[Any, ...]) -> Any:
+        try:
+            # exceptions, e.g. Nothing, are not cached
+            value = await self.pipe(*args)
+        finally:
+            del self._in_flight[key]
+
+        expires_at = None
+        if self.ttl is not None:
+            expires_at = time.monotonic() + self.ttl.total_seconds()
+        self._entries[key] = _Entry(value=value, expires_at=expires_at)
+
+        if self.maxsize is not None:
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+        return value
+
+
+def _make_key(args: tuple[Any, ...]) -> tuple[Any, ...]:
+    # arguments of different types are cached separately, e.g. 1, 1.0 and True,
+    # as functools.lru_cache does with typed=True
+    return (*args, *map(type, args))
+
+
+def _retrieve_exception(task: asyncio.Task[Any]) -> None:
+    if not task.cancelled():
+        task.exception()
@@ -24,6 +24,9 @@ class Maybe(Pipe):
         # appends to empty list
         self.append_responsible_pipe(self.input_pipe)
 
+    def children(self) -> list[Pipe]:
+        return self.responsible_pipes
+
     async def __call__(self, *args: Any) -> Any:
         for pipe in self.responsible_pipes:
             try:
@@ -1,26 +1,64 @@
 import asyncio
-from dataclasses import dataclass
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from typing import Any
 
 from etl_pipes.pipes.base_pipe import Pipe
 
+PipeCall = tuple[Pipe, tuple[Any, ...]]
+
 
 @dataclass
 class Parallel(Pipe):
     pipes: list[Pipe]
+    # maximum number of pipes running at once, None means no limit
+    max_concurrency: int | None = field(default=None)
+    # cancel the rest of the pipes as soon as one of them fails,
+    # otherwise wait for all of them and raise the first error
+    fail_fast: bool = field(default=True)
+
+    def __post_init__(self) -> None:
+        if self.max_concurrency is not None and self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be positive")
+
+    def children(self) -> list[Pipe]:
+        return self.pipes
 
     async def __call__(self, *args: Any) -> tuple[Any, ...]:
-        tasks = []
+        calls: list[PipeCall]
         if not args:
-            tasks = self._create_tasks()
+            calls = [(pipe, ()) for pipe in self.pipes]
         else:
-            for pipe, arg in zip(self.pipes, args):
-                tasks.append(self._create_task(pipe, arg))
-        results = await asyncio.gather(*tasks)
-        return tuple(results)
+            calls = [(pipe, (arg,)) for pipe, arg in zip(self.pipes, args)]
+        return await self._run(calls)
 
-    def _create_tasks(self, *args: Any) -> list[asyncio.Task[Any]]:
-        return [self._create_task(pipe, *args) for pipe in self.pipes]
+    async def _run(self, calls: list[PipeCall]) -> tuple[Any, ...]:
+        results: list[Any] = [None] * len(calls)
+        errors: dict[int, Exception] = {}
 
-    def _create_task(self, pipe: Pipe, *args: Any) -> asyncio.Task[Any]:
-        return asyncio.create_task(pipe(*args))
+        async def work(indexed_calls: Iterator[tuple[int, PipeCall]]) -> None:
+            # workers share the iterator, so at most max_concurrency pipes run
+            for index, (pipe, pipe_args) in indexed_calls:
+                try:
+                    results[index] = await pipe(*pipe_args)
+                except Exception as e:
+                    if self.fail_fast:
+                        raise
+                    errors[index] = e
+
+        workers_count = len(calls)
+        if self.max_concurrency is not None:
+            workers_count = min(workers_count, self.max_concurrency)
+        indexed_calls = enumerate(calls)
+
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for _ in range(workers_count):
+                    task_group.create_task(work(indexed_calls))
+        except ExceptionGroup as e:
+            # keep the behaviour of gather, which raises the error itself
+            raise e.exceptions[0]
+
+        if errors:
+            raise errors[min(errors)]
+        return tuple(results)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any
+
+from etl_pipes.pipes.base_pipe import Pipe
+
+
+@dataclass
+class ParallelMapReduce(Pipe):
+    # called with a list of items, returns a mapped chunk
+    mapper: Pipe
+    # called with an accumulator and a mapped chunk, returns a new accumulator
+    reducer: Pipe
+    initial: Any = None
+
+    chunk_size: int = 1000
+    max_in_flight: int = 4
+    # when False chunks are reduced in completion order,
+    # so the reducer should not depend on the order of chunks
+    ordered: bool = False
+
+    def __post_init__(self) -> None:
+        if self.chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        if self.max_in_flight < 1:
+            raise ValueError("max_in_flight must be positive")
+
+    def children(self) -> list[Pipe]:
+        return [self.mapper, self.reducer]
+
+    async def __call__(  # type: ignore[override]
+        self, iterable: Iterable[Any] | AsyncIterable[Any]
+    ) -> Any:
+        state = _ReduceState(accumulator=self.initial)
+        pending: set[asyncio.Task[tuple[int, Any]]] = set()
+
+        try:
+            index = 0
+            async for chunk in self._split(iterable):
+                # chunks waiting for their turn in ordered mode hold memory too
+                while len(pending) + len(state.ready) >= self.max_in_flight:
+                    pending = await self._reduce_completed(pending, state)
+
+                pending.add(asyncio.create_task(self._map(index, chunk)))
+                index += 1
+
+            while pending:
+                pending = await self._reduce_completed(pending, state)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            # retrieves the errors of other failed chunks as well
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+
+        return state.accumulator
+
+    async def _split(
+        self, iterable: Iterable[Any] | AsyncIterable[Any]
+    ) -> AsyncIterator[list[Any]]:
+        if isinstance(iterable, AsyncIterable):
+            chunk = []
+            async for item in iterable:
+                chunk.append(item)
+                if len(chunk) == self.chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+            return
+
+        iterator = iter(iterable)
+        while chunk := list(islice(iterator, self.chunk_size)):
+            yield chunk
+
+    async def _map(self, index: int, chunk: list[Any]) -> tuple[int, Any]:
+        return index, await self.mapper(chunk)
+
+    async def _reduce_completed(
+        self,
+        pending: set[asyncio.Task[tuple[int, Any]]],
+        state: _ReduceState,
+    ) -> set[asyncio.Task[tuple[int, Any]]]:
+        done, still_pending = await asyncio.wait(
+            pending, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in done:
+            index, mapped_chunk = task.result()
+            if not self.ordered:
+                state.accumulator = await self.reducer(state.accumulator, mapped_chunk)
+                continue
+
+            state.ready[index] = mapped_chunk
+            while state.next_index in state.ready:
+                mapped_chunk = state.ready.pop(state.next_index)
+                state.accumulator = await self.reducer(state.accumulator, mapped_chunk)
+                state.next_index += 1
+        return still_pending
+
+
+@dataclass
+class _ReduceState:
+    accumulator: Any
+    next_index: int = 0
+    # mapped chunks which are completed before their predecessors
+    ready: dict[int, Any] = field(default_factory=dict)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, NamedTuple, assert_never
+
+from etl_pipes.pipes.base_pipe import Pipe
+
+if TYPE_CHECKING:
+    from etl_pipes.pipes.pipeline.pipeline import Pipeline
+
+Selector = Callable[[Any], Any]
+
+
+class CompiledStage(NamedTuple):
+    call: Callable[..., Awaitable[Any]]
+    # True when the input of the stage is known to be a tuple beforehand,
+    # so the runtime `type(data) is tuple` check can be skipped
+    always_unpack: bool
+    select: Selector | None
+
+
+def compile_selector(pos: int | slice | tuple[int, ...]) -> Selector:
+    match pos:
+        case int():
+            return itemgetter(pos)
+        case slice():
+            return lambda data: tuple(data[pos])
+        case tuple():
+            if len(pos) == 1:
+                (i,) = pos
+                return lambda data: (data[i],)
+            if not pos:
+                return lambda data: ()
+            # itemgetter with several keys already returns a tuple
+            return itemgetter(*pos)
+        case _:
+            assert_never(pos)
+
+
+def compose_selectors(inner: Selector | None, outer: Selector) -> Selector:
+    if inner is None:
+        return outer
+
+    def composed(data: Any) -> Any:
+        return outer(inner(data))
+
+    return composed
+
+
+def returns_tuple(pos: int | slice | tuple[int, ...]) -> bool:
+    return not isinstance(pos, int)
+
+
+@dataclass
+class ExecutionPlan:
+    stages: list[CompiledStage] = field(default_factory=list)
+    output_is_tuple: bool = False
+    # compiled pipelines with their pipes at compile time, the plan is stale
+    # when any of them is changed later, in place or by assigning new pipes
+    sources: list[tuple[Pipeline, tuple[Pipe, ...]]] = field(default_factory=list)
+
+    @classmethod
+    def from_pipes(
+        cls, pipes: list[Pipe], input_is_tuple: bool = True
+    ) -> ExecutionPlan:
+        # pipeline arguments are always passed as a tuple,
+        # a plan continuing another one gets its output_is_tuple instead
+        plan = cls()
+        plan.output_is_tuple = plan._extend(pipes, input_is_tuple)
+        return plan
+
+    @classmethod
+    def from_pipeline(cls, pipeline: Pipeline) -> ExecutionPlan:
+        plan = cls.from_pipes(pipeline.pipes)
+        plan.sources.append((pipeline, tuple(pipeline.pipes)))
+        return plan
+
+    def is_stale(self) -> bool:
+        # tuples are compared by identity of the pipes first, which is cheap
+        return any(tuple(pipeline.pipes) != pipes for pipeline, pipes in self.sources)
+
+    async def run(self, data: Any) -> Any:
+        for call, always_unpack, select in self.stages:
+            if always_unpack or type(data) is tuple:
+                data = await call(*data)
+            else:
+                data = await call(data)
+
+            if select is not None:
+                data = select(data)
+        return data
+
+    def _extend(self, pipes: list[Pipe], input_is_tuple: bool) -> bool:
+        # avoid circular import, Pipeline depends on the plan
+        from etl_pipes.pipes.pipeline.pipeline import Pipeline
+
+        for pipe in pipes:
+            if (
+                isinstance(pipe, Pipeline)
+                # subclasses may change the way stages are executed
+                and type(pipe).__call__ is Pipeline.__call__
+                # an empty pipeline returns its arguments as a tuple,
+                # it is simpler to keep it as a regular stage
+                and pipe.pipes
+            ):
+                self.sources.append((pipe, tuple(pipe.pipes)))
+                input_is_tuple = self._extend(pipe.pipes, input_is_tuple)
+                if pipe.out.is_modified:
+                    self._select_last(pipe.out.pos)
+                    input_is_tuple = returns_tuple(pipe.out.pos)
+                continue
+
+            select = compile_selector(pipe.out.pos) if pipe.out.is_modified else None
+            self.stages.append(
+                CompiledStage(
+                    call=self._resolve_call(pipe),
+                    always_unpack=input_is_tuple,
+                    select=select,
+                )
+            )
+            input_is_tuple = pipe.out.is_modified and returns_tuple(pipe.out.pos)
+        return input_is_tuple
+
+    def _select_last(self, pos: int | slice | tuple[int, ...]) -> None:
+        call, always_unpack, select = self.stages[-1]
+        self.stages[-1] = CompiledStage(
+            call=call,
+            always_unpack=always_unpack,
+            select=compose_selectors(select, compile_selector(pos)),
+        )
+
+    @staticmethod
+    def _resolve_call(pipe: Pipe) -> Callable[..., Awaitable[Any]]:
+        # pipes created by as_pipe can be called directly,
+        # skipping the Pipe.__call__ indirection
+        if type(pipe).__call__ is Pipe.__call__ and pipe.f is not None:
+            return pipe.f
+        return pipe.__call__
@@ -1,8 +1,12 @@
 import inspect
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import pairwise
 from types import UnionType
-from typing import Any, Union, cast, get_args, get_origin
+from typing import Any, NamedTuple, Union, cast, get_args, get_origin
+from weakref import WeakKeyDictionary
 
+from etl_pipes.domain.types import AnyFunc
 from etl_pipes.pipes.base_pipe import Pipe
 from etl_pipes.pipes.pipeline.exceptions import (
     ElementIsNotPipeError,
@@ -13,6 +17,21 @@ from etl_pipes.pipes.pipeline.exceptions import (
 
 
 def is_compatible_type(value_type: type | str, signature_type: type | str) -> bool:
+    try:
+        hash((value_type, signature_type))
+    except TypeError:
+        return _is_compatible_type(value_type, signature_type)
+    return _cached_is_compatible_type(value_type, signature_type)
+
+
+@lru_cache(maxsize=4096)
+def _cached_is_compatible_type(
+    value_type: type | str, signature_type: type | str
+) -> bool:
+    return _is_compatible_type(value_type, signature_type)
+
+
+def _is_compatible_type(value_type: type | str, signature_type: type | str) -> bool:
     if type(signature_type) is str or type(value_type) is str:
         return signature_type == value_type
 
@@ -63,6 +82,59 @@ def is_compatible_type(value_type: type | str, signature_type: type | str) -> bo
     return issubclass(value_type, signature_type)
 
 
+class PipeTyping(NamedTuple):
+    arg_type: type
+    return_type: type
+
+
+# keyed by the function itself, so all instances of a pipe class share an entry
+_function_typing: WeakKeyDictionary[AnyFunc, PipeTyping] = WeakKeyDictionary()
+# bound methods are recreated on every attribute access, key by their function
+_method_typing: WeakKeyDictionary[AnyFunc, PipeTyping] = WeakKeyDictionary()
+
+
+def get_pipe_typing(pipe: Pipe) -> PipeTyping:
+    pipe_call = pipe.get_callable()
+
+    key: AnyFunc
+    if inspect.ismethod(pipe_call):
+        cache, key = _method_typing, pipe_call.__func__
+    else:
+        cache, key = _function_typing, pipe_call
+
+    try:
+        return cache[key]
+    except KeyError:
+        pass
+    except TypeError:
+        # callable is not weak referenceable, e.g. an instance with __slots__
+        return _inspect_pipe_typing(pipe_call)
+
+    pipe_typing = _inspect_pipe_typing(pipe_call)
+    cache[key] = pipe_typing
+    return pipe_typing
+
+
+def _inspect_pipe_typing(pipe_call: AnyFunc) -> PipeTyping:
+    # Using inspect to get annotations
+    signature = inspect.signature(pipe_call)
+    arg_types: list[type] = [
+        param.annotation for name, param in signature.parameters.items()
+    ]
+
+    # Handle cases where there are no annotations or multiple annotations
+    arg_type: type = type(None)
+    match len(arg_types):
+        case 0:
+            pass
+        case 1:
+            arg_type = arg_types[0]
+        case _:
+            arg_type = tuple[*arg_types]  # type: ignore
+
+    return PipeTyping(arg_type=arg_type, return_type=signature.return_annotation)
+
+
 @dataclass
 class PipeWeldingValidator:
     def validate(self, pipes: list[Pipe]) -> None:
@@ -77,38 +149,23 @@ class PipeWeldingValidator:
 
         self._validate_pipe_typing(pipes)
 
+    def validate_append(self, pipes: list[Pipe], pipe: Pipe) -> None:
+        # pipes are assumed to be validated already, so only the new edge is checked
+        if not isinstance(pipe, Pipe):
+            raise ElementIsNotPipeError(pipe)
+        if not pipes:
+            raise OnlyOnePipeInPipelineError()
+
+        self._validate_edge(pipes[-1], pipe)
+
     def _validate_pipe_typing(self, pipes: list[Pipe]) -> None:
-        for i in range(len(pipes) - 1):
-            current_pipe = pipes[i]
-
-            next_pipe = pipes[i + 1]
-
-            current_pipe_call = current_pipe.get_callable()
-            next_pipe_call = next_pipe.get_callable()
-
-            # Using inspect to get annotations
-            next_pipe_signature = inspect.signature(next_pipe_call)
-            next_pipe_arg_types: list[type] = [
-                param.annotation
-                for name, param in next_pipe_signature.parameters.items()
-            ]
-
-            # Handle cases where there are no annotations or multiple annotations
-            next_pipe_arg_type: type = type(None)
-            match len(next_pipe_arg_types):
-                case 0:
-                    pass
-                case 1:
-                    next_pipe_arg_type = next_pipe_arg_types[0]
-                case _:
-                    next_pipe_arg_type = tuple[*next_pipe_arg_types]  # type: ignore
-
-            # Get the return type annotation for the current pipe
-            current_pipe_return_type = inspect.signature(
-                current_pipe_call
-            ).return_annotation
-
-            # Use is_compatible_type to check for type compatibility
-
-            if not is_compatible_type(current_pipe_return_type, next_pipe_arg_type):
-                raise PipelineTypeError(current_pipe, next_pipe)
+        for current_pipe, next_pipe in pairwise(pipes):
+            self._validate_edge(current_pipe, next_pipe)
+
+    def _validate_edge(self, current_pipe: Pipe, next_pipe: Pipe) -> None:
+        current_pipe_return_type = get_pipe_typing(current_pipe).return_type
+        next_pipe_arg_type = get_pipe_typing(next_pipe).arg_type
+
+        # Use is_compatible_type to check for type compatibility
+        if not is_compatible_type(current_pipe_return_type, next_pipe_arg_type):
+            raise PipelineTypeError(current_pipe, next_pipe)
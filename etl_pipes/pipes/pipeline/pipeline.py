@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+from collections.abc import AsyncGenerator, AsyncIterable, Iterable
 from dataclasses import dataclass, field
 from typing import Any, assert_never
 
 from etl_pipes.context import Context
 from etl_pipes.pipes.base_pipe import Pipe
+from etl_pipes.pipes.pipeline.execution_plan import ExecutionPlan
 from etl_pipes.pipes.pipeline.pipe_welding_validator import PipeWeldingValidator
+from etl_pipes.pipes.pipeline.stream import PipeStream
 
 
 @dataclass
@@ -15,17 +18,33 @@ class Pipeline(Pipe):
     ignore_validation: bool = field(default=True)
     context: Context | None = field(default=None)
 
+    plan: ExecutionPlan | None = field(init=False, default=None, repr=False)
+
     def __post_init__(self) -> None:
         self.apply_context(self.context)
 
         self._validate()
 
-    def apply_context(self, context: Context | None) -> None:
-        if context:
-            for pipe in self.pipes:
-                pipe.apply_context(context)
+    def children(self) -> list[Pipe]:
+        return self.pipes
+
+    def compile(self) -> Pipeline:
+        # validation is done once here instead of on every call,
+        # nested pipelines are flattened into a single list of stages
+        self._validate()
+        self.plan = ExecutionPlan.from_pipeline(self)
+        return self
 
     async def __call__(self, *args: Any) -> Any:
+        plan = self.plan
+        if plan is not None:
+            if plan.is_stale():
+                # the pipes were changed after the plan was compiled,
+                # it is rebuilt once on the next call instead of on every change
+                self._validate()
+                plan = self.plan = ExecutionPlan.from_pipeline(self)
+            return await plan.run(args)
+
         self._validate()
 
         data = args
@@ -37,6 +56,24 @@ class Pipeline(Pipe):
                 data = self._modify_output(pipe.out.pos, data)
         return data
 
+    def stream(
+        self,
+        source: AsyncIterable[Any] | Iterable[Any],
+        buffer_size: int = 64,
+        concurrency: int | list[int] = 1,
+        ordered: bool = True,
+    ) -> AsyncGenerator[Any, None]:
+        # every record is processed as if the pipeline was called with it,
+        # top-level pipes work as separate stages connected with bounded queues
+        self._validate()
+        pipe_stream = PipeStream(
+            self.pipes,
+            buffer_size=buffer_size,
+            concurrency=concurrency,
+            ordered=ordered,
+        )
+        return pipe_stream(source)
+
     async def _call_pipe_with_data(self, pipe: Pipe, data: Any) -> Any:
         # think about library type for this,
         # tuple seems to be a crucial part of the pipeline
@@ -58,9 +95,9 @@ class Pipeline(Pipe):
         return data
 
     def __rshift__(self, other: Pipe) -> Pipeline:
+        if not self.ignore_validation:
+            self.validator.validate_append(self.pipes, other)
         self.pipes.append(other)
-        self._validate()
-
         return self
 
     def _validate(self) -> None:
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterable, Iterable
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Any
+
+from etl_pipes.pipes.base_pipe import Pipe
+from etl_pipes.pipes.pipeline.execution_plan import ExecutionPlan
+
+
+class _End:
+    pass
+
+
+_END = _End()
+
+
+@dataclass(frozen=True)
+class _Failure:
+    exception: BaseException
+
+
+@dataclass
+class PipeStream:
+    pipes: list[Pipe]
+    # maximum number of records waiting in front of every stage
+    buffer_size: int = 64
+    # number of records processed concurrently by every top-level pipe,
+    # either one value for all pipes or a value per pipe
+    concurrency: int | list[int] = 1
+    ordered: bool = True
+
+    plans: list[ExecutionPlan] = field(init=False, default_factory=list)
+    concurrencies: list[int] = field(init=False, default_factory=list)
+
+    def __post_init__(self) -> None:
+        if self.buffer_size < 1:
+            raise ValueError("buffer_size must be positive")
+        self.plans = self._compile_plans()
+        self.concurrencies = self._resolve_concurrencies()
+
+    async def __call__(
+        self, source: AsyncIterable[Any] | Iterable[Any]
+    ) -> AsyncGenerator[Any, None]:
+        queues: list[asyncio.Queue[Any]] = [
+            asyncio.Queue(self.buffer_size) for _ in range(len(self.plans) + 1)
+        ]
+        # bounds records between the source and the consumer,
+        # including the ones held back to restore the order
+        in_flight = asyncio.Semaphore(
+            self.buffer_size * len(queues) + sum(self.concurrencies)
+        )
+
+        tasks = [asyncio.create_task(self._feed(source, queues[0], in_flight))]
+        for stage in range(len(self.plans)):
+            tasks.append(asyncio.create_task(self._run_stage(stage, queues)))
+
+        try:
+            async with aclosing(self._collect(queues[-1], in_flight)) as results:
+                async for data in results:
+                    yield data
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _compile_plans(self) -> list[ExecutionPlan]:
+        plans = []
+        input_is_tuple = True
+        for pipe in self.pipes:
+            plan = ExecutionPlan.from_pipes([pipe], input_is_tuple)
+            input_is_tuple = plan.output_is_tuple
+            plans.append(plan)
+        return plans
+
+    def _resolve_concurrencies(self) -> list[int]:
+        if isinstance(self.concurrency, int):
+            concurrencies = [self.concurrency] * len(self.pipes)
+        else:
+            concurrencies = list(self.concurrency)
+
+        if len(concurrencies) != len(self.pipes):
+            raise ValueError("concurrency must be set for every pipe")
+        if any(concurrency < 1 for concurrency in concurrencies):
+            raise ValueError("concurrency must be positive")
+        return concurrencies
+
+    def _consumers(self, queue: int) -> int:
+        if queue < len(self.concurrencies):
+            return self.concurrencies[queue]
+        # the last queue is read by the stream consumer only
+        return 1
+
+    async def _feed(
+        self,
+        source: AsyncIterable[Any] | Iterable[Any],
+        outbox: asyncio.Queue[Any],
+        in_flight: asyncio.Semaphore,
+    ) -> None:
+        try:
+            seq = 0
+            if isinstance(source, AsyncIterable):
+                async for record in source:
+                    await in_flight.acquire()
+                    await outbox.put((seq, (record,)))
+                    seq += 1
+            else:
+                for record in source:
+                    await in_flight.acquire()
+                    await outbox.put((seq, (record,)))
+                    seq += 1
+        except Exception as e:
+            await outbox.put(_Failure(e))
+            return
+
+        for _ in range(self._consumers(0)):
+            await outbox.put(_END)
+
+    async def _run_stage(self, stage: int, queues: list[asyncio.Queue[Any]]) -> None:
+        plan, inbox, outbox = self.plans[stage], queues[stage], queues[stage + 1]
+        workers = [
+            asyncio.create_task(self._work(plan, inbox, outbox))
+            for _ in range(self.concurrencies[stage])
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        for _ in range(self._consumers(stage + 1)):
+            await outbox.put(_END)
+
+    async def _work(
+        self,
+        plan: ExecutionPlan,
+        inbox: asyncio.Queue[Any],
+        outbox: asyncio.Queue[Any],
+    ) -> None:
+        while True:
+            item = await inbox.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                # failures are passed through to the consumer
+                await outbox.put(item)
+                continue
+
+            seq, data = item
+            try:
+                data = await plan.run(data)
+            except Exception as e:
+                await outbox.put(_Failure(e))
+                continue
+            await outbox.put((seq, data))
+
+    async def _collect(
+        self, sink: asyncio.Queue[Any], in_flight: asyncio.Semaphore
+    ) -> AsyncGenerator[Any, None]:
+        next_seq = 0
+        # records completed before their predecessors
+        ready: dict[int, Any] = {}
+
+        while True:
+            item = await sink.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.exception
+
+            seq, data = item
+            if not self.ordered:
+                in_flight.release()
+                yield data
+                continue
+
+            ready[seq] = data
+            while next_seq in ready:
+                data = ready.pop(next_seq)
+                next_seq += 1
+                in_flight.release()
+                yield data
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+
+from etl_pipes.pipes.base_pipe import Pipe
+from etl_pipes.pipes.maybe import Nothing, UnhandledNothingError
+
+
+@dataclass
+class Race(Pipe):
+    input_pipe: Pipe
+    # None starts all pipes at once, otherwise the next pipe is started
+    # when the running ones don't return within the delay or raise Nothing
+    hedge_delay: timedelta | None = field(default=None)
+
+    responsible_pipes: list[Pipe] = field(init=False, default_factory=list)
+
+    def __post_init__(self) -> None:
+        # appends to empty list
+        self.append_responsible_pipe(self.input_pipe)
+
+    def children(self) -> list[Pipe]:
+        return self.responsible_pipes
+
+    async def __call__(self, *args: Any) -> Any:
+        not_started = iter(self.responsible_pipes)
+        running: set[asyncio.Task[Any]] = set()
+        # pipes which finish together are taken in the order they were added
+        order: dict[asyncio.Task[Any], int] = {}
+
+        def start_next() -> bool:
+            pipe = next(not_started, None)
+            if pipe is None:
+                return False
+            task = asyncio.create_task(pipe(*args))
+            order[task] = len(order)
+            running.add(task)
+            return True
+
+        if self.hedge_delay is None:
+            while start_next():
+                pass
+            delay = None
+        else:
+            start_next()
+            delay = self.hedge_delay.total_seconds()
+
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                running -= done
+                if not done:
+                    # hedging, the running pipes are too slow
+                    if not start_next():
+                        delay = None
+                    continue
+
+                winner = self._pick(done, order)
+                if winner is not None:
+                    return winner.result()
+                for _ in done:
+                    # no need to wait for the delay, the pipes are already missed
+                    start_next()
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+        raise UnhandledNothingError("No pipe was able to handle the input")
+
+    @staticmethod
+    def _pick(
+        done: set[asyncio.Task[Any]], order: dict[asyncio.Task[Any], int]
+    ) -> asyncio.Task[Any] | None:
+        # exceptions of all finished pipes are retrieved before one is picked,
+        # None when all of them raised Nothing
+        finished = sorted(done, key=order.__getitem__)
+        exceptions = [task.exception() for task in finished]
+        for task, exception in zip(finished, exceptions):
+            if exception is None:
+                return task
+        for exception in exceptions:
+            if exception is not None and not isinstance(exception, Nothing):
+                raise exception
+        return None
+
+    def otherwise(self, pipe: Pipe) -> Race:
+        self.append_responsible_pipe(pipe)
+        return self
+
+    def append_responsible_pipe(self, pipe: Pipe) -> None:
+        self.responsible_pipes = [*self.responsible_pipes, pipe]
@@ -1,6 +1,6 @@
 import asyncio
 import random
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import timedelta
 from typing import Any
 
@@ -71,7 +71,7 @@ async def test_simple_actor() -> None:
     actor_system_run_task = asyncio.create_task(actor_system.run())
     for msg in ["11,22,3b3", "44,55,66"]:
         await actor_system.insert_result_message(msg, to_actor=splitting_actor.id)
-    await asyncio.sleep(5)
+    await actor_system.drain()
     actor_system.kill()
     await actor_system_run_task
 
@@ -102,5 +102,232 @@ async def test_simple_actor() -> None:
     assert sorted([str(exc) for exc in exceptions]) == ["Non-digit character b in 3b3"]
 
 
+@pytest.mark.asyncio
+async def test_kill_with_drain_finishes_in_flight_messages() -> None:
+    splitting_actor = SplittingActor()
+    digit_actor = DigitActor()
+    print_actor = PrintActor()
+
+    actor_system = ActorSystem(
+        actors=[splitting_actor, digit_actor, print_actor],
+        no_outcome_timeout=timedelta(seconds=0.1),
+    )
+
+    splitting_actor >> digit_actor >> print_actor
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    for msg in ["11,22", "44,55"]:
+        await actor_system.insert_result_message(msg, to_actor=splitting_actor.id)
+    actor_system.kill(drain=True)
+    await actor_system_run_task
+
+    # finished tasks are not kept by the system
+    assert not actor_system.process_tasks
+
+    results = []
+    async for result in actor_system.stream_actor_unpacked_results(print_actor):
+        results.append(result)
+    assert sorted(results) == ["1", "1", "2", "2", "4", "4", "5", "5"]
+
+
+@dataclass
+class ConcurrencyTrackingActor(Actor):
+    name: str = "concurrency_tracking_actor"
+    running: int = 0
+    max_running: int = 0
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return Output().save_result(message_data)
+
+
+@pytest.mark.asyncio
+async def test_actor_workers_bound_concurrency() -> None:
+    tracking_actor = ConcurrencyTrackingActor(mailbox_capacity=2, workers=3)
+    actor_system = ActorSystem(
+        actors=[tracking_actor], no_outcome_timeout=timedelta(seconds=0.1)
+    )
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    for i in range(20):
+        await actor_system.insert_result_message(i, to_actor=tracking_actor.id)
+        # the blocking mailbox holds back the sender
+        assert tracking_actor.mailbox.qsize() <= tracking_actor.mailbox_capacity
+    actor_system.kill(drain=True)
+    await actor_system_run_task
+
+    assert tracking_actor.max_running == tracking_actor.workers
+
+    results = []
+    async for result in actor_system.stream_actor_unpacked_results(tracking_actor):
+        results.append(result)
+    assert sorted(results) == list(range(20))
+
+
+@dataclass
+class BatchRecordingActor(Actor):
+    name: str = "batch_recording_actor"
+    batches: list[list[Any]] = field(default_factory=list)
+
+    async def process_batch(self, results: list[Any]) -> Output | None:
+        self.batches.append(results)
+        return Output(results=[result * 10 for result in results])
+
+
+@pytest.mark.asyncio
+async def test_outputs_are_delivered_in_batches() -> None:
+    splitting_actor = SplittingActor()
+    recording_actor = BatchRecordingActor()
+    actor_system = ActorSystem(
+        actors=[splitting_actor, recording_actor],
+        no_outcome_timeout=timedelta(seconds=0.1),
+        max_batch_size=3,
+    )
+
+    splitting_actor >> recording_actor
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    await actor_system.insert_result_message("1,2,3,4,5", to_actor=splitting_actor.id)
+    actor_system.kill(drain=True)
+    await actor_system_run_task
+
+    assert recording_actor.batches == [["1", "2", "3"], ["4", "5"]]
+
+    results = []
+    async for result in actor_system.stream_actor_unpacked_results(recording_actor):
+        results.append(result)
+    assert results == ["1" * 10, "2" * 10, "3" * 10, "4" * 10, "5" * 10]
+
+
+@pytest.mark.asyncio
+async def test_streams_end_with_the_input() -> None:
+    splitting_actor = SplittingActor()
+    digit_actor = DigitActor(workers=2)
+    print_actor = PrintActor()
+
+    # streams must not wait for the timeout
+    actor_system = ActorSystem(
+        actors=[splitting_actor, digit_actor, print_actor],
+        no_outcome_timeout=timedelta(minutes=1),
+    )
+
+    splitting_actor >> digit_actor >> print_actor
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    for msg in ["11,22", "44"]:
+        await actor_system.insert_result_message(msg, to_actor=splitting_actor.id)
+    await actor_system.end_input(splitting_actor)
+
+    async with asyncio.timeout(5):
+        results = []
+        async for result in actor_system.stream_actor_unpacked_results(print_actor):
+            results.append(result)
+        exceptions = []
+        async for exception in actor_system.stream_actor_unpacked_exceptions(
+            print_actor
+        ):
+            exceptions.append(exception)
+        await actor_system.join()
+
+    assert sorted(results) == ["1", "1", "2", "2", "4", "4"]
+    assert not exceptions
+
+    actor_system.kill()
+    await actor_system_run_task
+
+
+@dataclass
+class FailOnXActor(Actor):
+    name: str = "fail_on_x_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        if message_data == "x":
+            raise ValueError("x is not accepted")
+        return Output().save_result(message_data)
+
+
+@dataclass
+class CharSplittingActor(Actor):
+    name: str = "char_splitting_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        return Output(results=list(message_data))
+
+
+@dataclass
+class BatchFailOnXActor(FailOnXActor):
+    name: str = "batch_fail_on_x_actor"
+
+    async def process_batch(self, results: list[Any]) -> Output | None:
+        # receives whole batches, which are processed item by item
+        return await super().process_batch(results)
+
+
+@pytest.mark.asyncio
+async def test_failed_item_does_not_lose_its_batch() -> None:
+    splitting_actor = CharSplittingActor()
+    failing_actor = BatchFailOnXActor()
+    actor_system = ActorSystem(
+        actors=[splitting_actor, failing_actor],
+        no_outcome_timeout=timedelta(seconds=0.1),
+    )
+
+    splitting_actor >> failing_actor
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    await actor_system.insert_result_message("abcxdef", to_actor=splitting_actor.id)
+    await actor_system.drain()
+    actor_system.kill()
+    await actor_system_run_task
+
+    results = []
+    async for result in actor_system.stream_actor_unpacked_results(failing_actor):
+        results.append(result)
+    assert results == ["a", "b", "c", "d", "e", "f"]
+    dead_letter = actor_system.dead_letters.queue.get_nowait()
+    assert dead_letter.message.data == "x"
+    assert isinstance(dead_letter.exception, ValueError)
+    assert actor_system.dead_letters.empty()
+
+
+@dataclass
+class SleepingActor(Actor):
+    name: str = "sleeping_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        await asyncio.sleep(0.05)
+        return Output().save_result(message_data)
+
+
+@pytest.mark.asyncio
+async def test_items_are_processed_concurrently_without_batch_method() -> None:
+    splitting_actor = CharSplittingActor()
+    sleeping_actor = SleepingActor()
+    actor_system = ActorSystem(
+        actors=[splitting_actor, sleeping_actor],
+        no_outcome_timeout=timedelta(seconds=0.1),
+    )
+
+    splitting_actor >> sleeping_actor
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    await actor_system.insert_result_message("x" * 100, to_actor=splitting_actor.id)
+    started_at = asyncio.get_running_loop().time()
+    await actor_system.drain()
+    elapsed = asyncio.get_running_loop().time() - started_at
+    actor_system.kill()
+    await actor_system_run_task
+
+    # sequentially the items would take 5 seconds
+    assert elapsed < 1
+    results = []
+    async for result in actor_system.stream_actor_unpacked_results(sleeping_actor):
+        results.append(result)
+    assert len(results) == 100  # noqa: PLR2004
+
+
 if __name__ == "__main__":
     asyncio.run(test_simple_actor())
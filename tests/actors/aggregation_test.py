@@ -0,0 +1,182 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+import pytest
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.actor_system import ActorSystem
+from etl_pipes.actors.aggregation import (
+    COUNT,
+    MAX,
+    MEAN,
+    SUM,
+    KeyedAggregateActor,
+    Window,
+    WindowActor,
+    WindowResult,
+)
+from etl_pipes.actors.common.types import Output
+
+
+async def aggregate(actor: KeyedAggregateActor, items: list[Any]) -> list[Any]:
+    results = []
+    for item in items:
+        output = await actor.process_result(item)
+        if output is not None:
+            results.extend(output.results)
+    output = await actor.process_end()
+    if output is not None:
+        results.extend(output.results)
+    return results
+
+
+def test_windows_are_validated() -> None:
+    with pytest.raises(ValueError):
+        Window.sliding(5, 2)
+    with pytest.raises(ValueError):
+        Window.sliding(timedelta(seconds=4), 2)
+    with pytest.raises(ValueError):
+        Window.tumbling(0)
+    with pytest.raises(ValueError):
+        Window.session(timedelta(0))
+    with pytest.raises(ValueError):
+        KeyedAggregateActor(aggregator=SUM, workers=2)
+
+
+@pytest.mark.asyncio
+async def test_keyed_aggregates_are_emitted_at_the_end() -> None:
+    actor = KeyedAggregateActor(aggregator=MEAN, key=lambda data: data % 2)
+
+    results = await aggregate(actor, [1, 2, 3, 4, 5])
+
+    assert results == [WindowResult(1, 3.0), WindowResult(0, 3.0)]
+
+
+@pytest.mark.asyncio
+async def test_count_windows() -> None:
+    tumbling = WindowActor(aggregator=SUM, window=Window.tumbling(2))
+    sliding = WindowActor(aggregator=SUM, window=Window.sliding(4, 2))
+
+    # the last tumbling window is closed at the end with fewer messages
+    assert [r.value for r in await aggregate(tumbling, [1, 2, 3, 4, 5])] == [3, 7, 5]
+    assert [r.value for r in await aggregate(sliding, [1, 2, 3, 4, 5, 6, 7])] == [
+        10,
+        18,
+        18,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_time_windows_close_as_the_time_passes() -> None:
+    tumbling = WindowActor(
+        aggregator=COUNT,
+        window=Window.tumbling(timedelta(seconds=10)),
+        timestamp=lambda data: data,
+    )
+    sliding = WindowActor(
+        aggregator=MAX,
+        window=Window.sliding(timedelta(seconds=10), timedelta(seconds=5)),
+        timestamp=lambda data: data,
+    )
+
+    assert await tumbling.process_result(1) is None
+    assert await tumbling.process_result(5) is None
+    output = await tumbling.process_result(12)
+    assert output is not None
+    assert output.results == [WindowResult(None, 2, 0.0, 10.0)]
+    assert [(r.start, r.end, r.value) for r in await aggregate(tumbling, [3, 31])] == [
+        (10.0, 20.0, 1),
+        (30.0, 40.0, 1),
+    ]
+
+    assert [
+        (r.start, r.end, r.value) for r in await aggregate(sliding, [1, 6, 12])
+    ] == [
+        (-5.0, 5.0, 1),
+        (0.0, 10.0, 6),
+        (5.0, 15.0, 12),
+        (10.0, 20.0, 12),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_session_windows() -> None:
+    actor = KeyedAggregateActor(
+        aggregator=COUNT,
+        key=lambda data: data[0],
+        window=Window.session(timedelta(seconds=5)),
+        timestamp=lambda data: data[1],
+    )
+
+    results = await aggregate(actor, [("a", 0), ("b", 1), ("a", 3), ("a", 9)])
+
+    assert results == [
+        WindowResult("b", 1, 1.0, 6.0),
+        WindowResult("a", 2, 0.0, 8.0),
+        WindowResult("a", 1, 9.0, 14.0),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_windows_close_without_new_messages() -> None:
+    actor = WindowActor(
+        aggregator=COUNT, window=Window.tumbling(timedelta(milliseconds=50))
+    )
+    actor_system = ActorSystem(actors=[actor])
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    for data in range(3):
+        await actor_system.insert_result_message(data, to_actor=actor.id)
+    results = actor_system.collected_results[actor.id]
+    # closed by the timer of the actor, the stream is not ended yet
+    counts = [(await asyncio.wait_for(results.get(), 1)).data.value]
+    while sum(counts) < 3:  # noqa: PLR2004
+        counts.append((await asyncio.wait_for(results.get(), 1)).data.value)
+    await actor_system.drain()
+    actor_system.kill()
+    await actor_system_run_task
+
+    assert sum(counts) == 3  # noqa: PLR2004
+
+
+@dataclass
+class SlowActor(Actor):
+    name: str = "slow_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        await asyncio.sleep(0.02)
+        return Output().save_result(message_data)
+
+
+@pytest.mark.asyncio
+async def test_windows_closed_by_the_timer_precede_the_end() -> None:
+    actor = KeyedAggregateActor(
+        aggregator=COUNT,
+        key=lambda data: data,
+        window=Window.tumbling(timedelta(milliseconds=50)),
+    )
+    # the timer waits for the mailbox of the slow actor while the stream
+    # is ended, before the windows are sent to the other actor
+    slow_actor = SlowActor(workers=1, mailbox_capacity=1)
+    other_actor = SlowActor(name="other_actor")
+    actor_system = ActorSystem(actors=[actor, slow_actor, other_actor])
+
+    actor >> slow_actor
+    actor >> other_actor
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    for data in range(5):
+        await actor_system.insert_result_message(data, to_actor=actor.id)
+    await asyncio.sleep(0.1)
+    async with asyncio.timeout(5):
+        await actor_system.drain()
+    actor_system.kill()
+    await actor_system_run_task
+
+    for receiver in [slow_actor, other_actor]:
+        results = []
+        async for result in actor_system.stream_actor_unpacked_results(receiver):
+            results.append(result)
+        assert sorted(result.key for result in results) == [0, 1, 2, 3, 4]
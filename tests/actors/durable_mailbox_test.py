@@ -0,0 +1,95 @@
+import asyncio
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.actor_system import ActorSystem
+from etl_pipes.actors.common.types import Output
+from etl_pipes.actors.durable_mailbox import DurableMailbox, SegmentLog
+
+
+@dataclass
+class SlowActor(Actor):
+    name: str = "slow_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        if message_data < 0:
+            # blocks until the system is killed
+            await asyncio.Event().wait()
+        return Output().save_result(message_data)
+
+
+def test_unacknowledged_records_are_recovered(tmp_path: Path) -> None:
+    log = SegmentLog(tmp_path, segment_size=64)
+    offsets = [log.append(bytes([index]) * 10) for index in range(10)]
+    for offset in (0, 2, 1, 5):
+        log.ack(offset)
+    log.close()
+
+    recovered = SegmentLog(tmp_path, segment_size=64)
+    records = recovered.recover()
+
+    # acknowledged records above the checkpoint are skipped as well
+    assert [offset for offset, _ in records] == [3, 4, *offsets[6:]]
+    assert records[0][1] == bytes([3]) * 10
+    # new records continue the log
+    assert recovered.append(b"next") == len(offsets)
+    # segments with acknowledged records only are deleted
+    assert len(list(tmp_path.glob("*.log"))) < len(offsets) // 2
+
+
+def test_torn_record_is_ignored(tmp_path: Path) -> None:
+    log = SegmentLog(tmp_path)
+    log.append(b"first")
+    log.append(b"second")
+    segment = log.segments[-1]
+    # the second record is only partly written
+    segment.file[segment.position - 2 : segment.position] = b"\0\0"
+    log.close()
+
+    assert [payload for _, payload in SegmentLog(tmp_path).recover()] == [b"first"]
+
+
+@pytest.mark.asyncio
+async def test_restarted_system_resumes_queued_messages(tmp_path: Path) -> None:
+    actor = SlowActor(workers=1, mailbox_path=tmp_path)
+    actor_system = ActorSystem(actors=[actor])
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    for data in (1, -1, 2, 3):
+        await actor_system.insert_result_message(data, to_actor=actor.id)
+    while actor.in_flight == 0 or actor.mailbox.qsize() > 2:  # noqa: PLR2004
+        await asyncio.sleep(0.01)
+    actor_system.kill()
+    await actor_system_run_task
+
+    # the blocked message is delivered again, so another worker is needed
+    restarted_actor = SlowActor(workers=2, mailbox_path=tmp_path)
+    assert isinstance(restarted_actor.mailbox, DurableMailbox)
+    restarted_system = ActorSystem(actors=[restarted_actor])
+
+    restarted_system_run_task = asyncio.create_task(restarted_system.run())
+    results = restarted_system.collected_results[restarted_actor.id]
+    collected = [(await results.get()).data for _ in range(2)]
+    restarted_system.kill()
+    await restarted_system_run_task
+
+    assert collected == [2, 3]
+    # the blocked message is still not acknowledged
+    assert len(SegmentLog(tmp_path).recover()) == 1
+
+
+@pytest.mark.asyncio
+async def test_unpicklable_message_is_not_pending(tmp_path: Path) -> None:
+    actor = SlowActor(mailbox_path=tmp_path)
+    actor_system = ActorSystem(actors=[actor])
+
+    with pytest.raises((AttributeError, pickle.PicklingError)):
+        await actor_system.insert_result_message(lambda: 1, to_actor=actor.id)
+    await actor_system.insert_result_message(1, to_actor=actor.id)
+    assert actor_system.pending_messages == 1
+    actor.mailbox.close()
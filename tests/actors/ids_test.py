@@ -0,0 +1,31 @@
+import multiprocessing
+
+from etl_pipes.actors.common.ids import next_id
+from etl_pipes.actors.common.types import Message
+
+
+def test_ids_are_unique_and_increasing() -> None:
+    ids = [next_id() for _ in range(1000)]
+    assert ids == sorted(set(ids))
+
+
+def _send_id(connection: "multiprocessing.connection.Connection") -> None:
+    connection.send(next_id())
+
+
+def test_forked_processes_do_not_share_ids() -> None:
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_send_id, args=(sender,))
+    process.start()
+    child_id = receiver.recv()
+    process.join()
+
+    assert child_id not in {next_id() for _ in range(1000)}
+
+
+def test_messages_are_not_traced_by_default() -> None:
+    first, second = Message(data=1), Message(data=2)
+
+    assert first.trace_id is None
+    assert first.id != second.id
@@ -0,0 +1,109 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+import pytest
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.actor_system import ActorSystem
+from etl_pipes.actors.common.types import Output
+from etl_pipes.actors.mailbox import Mailbox, MailboxFullError, OverflowPolicy
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_keeps_latest_items() -> None:
+    mailbox: Mailbox[int] = Mailbox(2, OverflowPolicy.DROP_OLDEST)
+
+    assert await mailbox.put(1) is None
+    assert await mailbox.put(2) is None
+    assert await mailbox.put(3) == 1
+
+    assert [await mailbox.get(), await mailbox.get()] == [2, 3]
+    assert mailbox.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_drop_newest_keeps_earliest_items() -> None:
+    mailbox: Mailbox[int] = Mailbox(2, OverflowPolicy.DROP_NEWEST)
+
+    for item in range(1, 4):
+        await mailbox.put(item)
+
+    assert [await mailbox.get(), await mailbox.get()] == [1, 2]
+    assert mailbox.empty()
+    assert mailbox.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_error_policy_rejects_items() -> None:
+    mailbox: Mailbox[int] = Mailbox(1, OverflowPolicy.ERROR)
+
+    await mailbox.put(1)
+    with pytest.raises(MailboxFullError):
+        await mailbox.put(2)
+    assert mailbox.qsize() == 1
+
+
+@dataclass
+class IdentityActor(Actor):
+    name: str = "identity_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        return Output().save_result(message_data)
+
+
+@pytest.mark.asyncio
+async def test_error_policy_raises_to_the_sender() -> None:
+    actor = IdentityActor(mailbox_capacity=1, overflow_policy=OverflowPolicy.ERROR)
+    actor_system = ActorSystem(actors=[actor])
+
+    await actor_system.insert_result_message(1, to_actor=actor.id)
+    with pytest.raises(MailboxFullError):
+        await actor_system.insert_result_message(2, to_actor=actor.id)
+    # the rejected message is not pending, so the system can still be drained
+    assert actor_system.pending_messages == 1
+
+
+@dataclass
+class SleepingActor(Actor):
+    name: str = "sleeping_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        await asyncio.sleep(0.05)
+        return Output().save_result(message_data)
+
+
+@pytest.mark.asyncio
+async def test_ends_of_streams_are_never_dropped() -> None:
+    fast_source = IdentityActor(name="fast_source")
+    slow_source = IdentityActor(name="slow_source")
+    # a single slow worker, so the end of the fast source waits in the mailbox
+    sink = SleepingActor(
+        mailbox_capacity=1, overflow_policy=OverflowPolicy.DROP_OLDEST, workers=1
+    )
+    actor_system = ActorSystem(
+        actors=[fast_source, slow_source, sink],
+        no_outcome_timeout=timedelta(minutes=1),
+    )
+
+    fast_source >> sink
+    slow_source >> sink
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    await actor_system.insert_result_message(1, to_actor=fast_source.id)
+    await actor_system.end_input(fast_source)
+    # the end of the fast source reaches the sink while it is busy
+    await asyncio.sleep(0.01)
+    for data in range(2, 10):
+        await actor_system.insert_result_message(data, to_actor=slow_source.id)
+    await actor_system.end_input(slow_source)
+
+    async with asyncio.timeout(5):
+        async for _ in actor_system.stream_actor_unpacked_results(sink):
+            pass
+        await actor_system.join()
+    actor_system.kill()
+    await actor_system_run_task
+
+    assert sink.open_inputs == 0
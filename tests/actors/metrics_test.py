@@ -0,0 +1,82 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+import pytest
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.actor_system import ActorSystem
+from etl_pipes.actors.common.types import Output
+from etl_pipes.actors.metrics import ActorSystemMetrics, Histogram, InMemoryExporter
+
+
+@dataclass
+class CheckPositiveActor(Actor):
+    name: str = "check_positive"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        if message_data < 0:
+            return Output().save_exception(ValueError(message_data))
+        if message_data == 0:
+            raise ZeroDivisionError
+        return Output().save_result(message_data)
+
+
+def test_histogram_counts_values_in_buckets() -> None:
+    bounds = (1.0, 10.0)
+    histogram = Histogram(bounds=bounds)
+
+    for value in (0.5, 1.0, 5.0, 50.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot.counts == (2, 1, 1)
+    assert snapshot.count == len([0.5, 1.0, 5.0, 50.0])
+    assert snapshot.mean == (0.5 + 1.0 + 5.0 + 50.0) / snapshot.count
+    assert snapshot.quantile(0.5) == bounds[0]
+    assert snapshot.quantile(0.75) == bounds[1]
+    assert snapshot.quantile(1.0) == float("inf")
+
+
+@pytest.mark.asyncio
+async def test_actor_system_collects_metrics() -> None:
+    first_actor, second_actor = CheckPositiveActor(), CheckPositiveActor(name="second")
+    exporter = InMemoryExporter()
+    metrics = ActorSystemMetrics(
+        exporter=exporter, export_interval=timedelta(milliseconds=10)
+    )
+    actor_system = ActorSystem(actors=[first_actor, second_actor], metrics=metrics)
+
+    first_actor >> second_actor
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    for data in (1, 2, -1, 0):
+        await actor_system.insert_result_message(data, to_actor=first_actor.id)
+    await actor_system.drain()
+    await asyncio.sleep(0.05)
+    actor_system.kill()
+    await actor_system_run_task
+
+    snapshot = exporter.last
+    assert snapshot is not None
+    assert len(exporter.snapshots) > 1
+    assert snapshot.pending_messages == 0
+
+    first = snapshot.actors[first_actor.id]
+    assert (first.messages_in, first.messages_out) == (4, 3)
+    assert (first.exceptions, first.failures) == (1, 1)
+    assert first.latency.count == first.messages_in
+    assert (first.mailbox_depth, first.in_flight) == (0, 0)
+
+    second = snapshot.actors[second_actor.id]
+    assert (second.messages_in, second.messages_out, second.exceptions) == (3, 3, 1)
+    # outputs of the last actor are collected
+    assert snapshot.end_to_end_latency.count == second.messages_out
+
+
+def test_snapshot_requires_metrics() -> None:
+    actor_system = ActorSystem(actors=[CheckPositiveActor()])
+
+    with pytest.raises(RuntimeError):
+        actor_system.metrics_snapshot()
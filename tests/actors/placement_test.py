@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.actor_system import ActorSystem
+from etl_pipes.actors.common.logging import actor_logger, start_queued_logging
+from etl_pipes.actors.common.types import Output
+from etl_pipes.actors.placement import ProcessCluster
+from etl_pipes.executors.thread_pool import configure_thread_pool, get_thread_pool
+
+
+@dataclass
+class SplittingActor(Actor):
+    name: str = "splitting_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        output = Output()
+        for digits in message_data.split(","):
+            output.save_result(digits)
+        return output
+
+
+@dataclass
+class DigitActor(Actor):
+    name: str = "digit_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        output = Output()
+        for char in message_data:
+            if not char.isdigit():
+                output.save_exception(ValueError(f"Non-digit character {char}"))
+                continue
+            output.save_result(int(char))
+        return output
+
+
+@dataclass
+class PidActor(Actor):
+    name: str = "pid_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        return Output().save_result((message_data, os.getpid()))
+
+
+@pytest.mark.asyncio
+async def test_actors_placed_on_worker_processes() -> None:
+    splitting_actor = SplittingActor()
+    digit_actor = DigitActor(process=0)
+    pid_actor = PidActor(process=1)
+
+    actor_system = ActorSystem(
+        actors=[splitting_actor, digit_actor, pid_actor],
+        no_outcome_timeout=timedelta(minutes=1),
+    )
+
+    splitting_actor >> digit_actor >> pid_actor
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    for msg in ["11,22", "3b3"]:
+        await actor_system.insert_result_message(msg, to_actor=splitting_actor.id)
+    await actor_system.drain()
+    actor_system.kill()
+    await actor_system_run_task
+
+    results = []
+    async for result in actor_system.stream_actor_unpacked_results(pid_actor):
+        results.append(result)
+    assert sorted(digit for digit, _ in results) == [1, 1, 2, 2, 3, 3]
+
+    pids = {pid for _, pid in results}
+    assert len(pids) == 1
+    assert os.getpid() not in pids
+
+    exceptions = []
+    async for exception in actor_system.stream_actor_unpacked_exceptions(pid_actor):
+        exceptions.append(exception)
+    assert [str(exception) for exception in exceptions] == ["Non-digit character b"]
+
+
+async def run_digits(actor_system: ActorSystem, actor: Actor, msg: str) -> list[Any]:
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    await actor_system.insert_result_message(msg, to_actor=actor.id)
+    async with asyncio.timeout(5):
+        await actor_system.drain()
+    actor_system.kill()
+    await actor_system_run_task
+
+    results = []
+    async for result in actor_system.stream_actor_unpacked_results(actor):
+        results.append(result)
+    return results
+
+
+@pytest.mark.asyncio
+async def test_systems_are_placed_one_after_another() -> None:
+    for msg in ["12", "34"]:
+        digit_actor = DigitActor(process=0)
+        actor_system = ActorSystem(actors=[digit_actor])
+        assert await run_digits(actor_system, digit_actor, msg) == [*map(int, msg)]
+
+
+@dataclass
+class ThreadedDigitActor(Actor):
+    name: str = "threaded_digit_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        actor_logger.warning("parsing %s", message_data)
+        digits = await get_thread_pool().run(list, map(int, message_data))
+        return Output(results=digits)
+
+
+@pytest.mark.asyncio
+async def test_workers_are_forked_with_running_threads(tmp_path: Path) -> None:
+    log_path = tmp_path / "actors.log"
+    listener = start_queued_logging(logging.FileHandler(log_path))
+    thread_pool = configure_thread_pool()
+    try:
+        # the threads of the pool and the listener are running during fork
+        await thread_pool.run(int, "1")
+        digit_actor = ThreadedDigitActor(process=0)
+        actor_system = ActorSystem(actors=[digit_actor])
+        assert await run_digits(actor_system, digit_actor, "12") == [1, 2]
+    finally:
+        listener.stop()
+        actor_logger.handlers.clear()
+        configure_thread_pool()
+
+    assert log_path.read_text() == "parsing 12\n"
+
+
+@pytest.mark.asyncio
+async def test_lost_messages_fail_the_system(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fail_to_receive(self: ActorSystem, messages: list[Any]) -> None:
+        raise RuntimeError("broken delivery")
+
+    # the worker inherits the patched class when it is forked
+    monkeypatch.setattr(ActorSystem, "receive", fail_to_receive)
+    digit_actor = DigitActor(process=0)
+    actor_system = ActorSystem(actors=[digit_actor])
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    await actor_system.insert_result_message("1", to_actor=digit_actor.id)
+    with pytest.raises(RuntimeError, match="lost"):
+        async with asyncio.timeout(5):
+            await actor_system.join()
+    actor_system.kill()
+    await actor_system_run_task
+
+
+@pytest.mark.asyncio
+async def test_failed_startup_is_raised_by_drain(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def fail_to_start(system: ActorSystem) -> None:
+        raise OSError("no more processes")
+
+    monkeypatch.setattr(ProcessCluster, "start", fail_to_start)
+    digit_actor = DigitActor(process=0)
+    actor_system = ActorSystem(actors=[digit_actor])
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    await actor_system.insert_result_message("1", to_actor=digit_actor.id)
+    with pytest.raises(RuntimeError, match="failed to start"):
+        async with asyncio.timeout(5):
+            await actor_system.drain()
+    with pytest.raises(OSError, match="no more processes"):
+        await actor_system_run_task
@@ -0,0 +1,132 @@
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, cast
+
+import pytest
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.actor_system import ActorSystem
+from etl_pipes.actors.common.types import Output
+from etl_pipes.actors.pool import Pool, RoutingStrategy
+
+
+@dataclass
+class SplittingActor(Actor):
+    name: str = "splitting_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        output = Output()
+        for item in message_data.split(","):
+            output.save_result(item)
+        return output
+
+
+@dataclass
+class TaggingActor(Actor):
+    # outputs the data together with the id of the member which processed it
+    name: str = "tagging_actor"
+    processed: list[Any] = field(default_factory=list)
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        await asyncio.sleep(0.001)
+        self.processed.append(message_data)
+        return Output().save_result((message_data, self.id))
+
+
+async def run_pool(pool: Pool, messages: list[str]) -> list[tuple[Any, Any]]:
+    splitting_actor = SplittingActor()
+    actor_system = ActorSystem(
+        actors=[splitting_actor, pool], no_outcome_timeout=timedelta(seconds=0.1)
+    )
+
+    splitting_actor >> pool
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    for msg in messages:
+        await actor_system.insert_result_message(msg, to_actor=splitting_actor.id)
+    await actor_system.drain()
+    actor_system.kill()
+    await actor_system_run_task
+
+    # the ends of the streams of all members are collected
+    assert actor_system.open_collected[pool.id] == 0
+
+    results = []
+    async for result in actor_system.stream_actor_unpacked_results(pool):
+        results.append(result)
+    return results
+
+
+@pytest.mark.asyncio
+async def test_round_robin_pool_shares_work() -> None:
+    pool = Pool(actor_factory=TaggingActor, size=3)
+
+    results = await run_pool(pool, [",".join(map(str, range(30)))])
+
+    # every item is processed once, by one of the members
+    assert sorted(int(item) for item, _ in results) == list(range(30))
+    assert Counter(member_id for _, member_id in results) == {
+        member.id: 10 for member in pool.members
+    }
+
+
+@pytest.mark.asyncio
+async def test_consistent_hash_pool_keeps_keys_on_members() -> None:
+    pool = Pool(
+        actor_factory=TaggingActor, size=4, strategy=RoutingStrategy.CONSISTENT_HASH
+    )
+
+    messages = ["a,b,c,d,e,f", "a,b,c", "d,e,f", "a"]
+    results = await run_pool(pool, messages)
+
+    members_by_key: dict[str, set[Any]] = {}
+    for item, member_id in results:
+        members_by_key.setdefault(item, set()).add(member_id)
+    assert len(results) == sum(len(msg.split(",")) for msg in messages)
+    assert all(len(members) == 1 for members in members_by_key.values())
+
+
+@pytest.mark.asyncio
+async def test_least_loaded_pool_uses_idle_members() -> None:
+    pool = Pool(
+        actor_factory=TaggingActor, size=2, strategy=RoutingStrategy.LEAST_LOADED
+    )
+
+    results = await run_pool(pool, [str(i) for i in range(10)])
+
+    assert sorted(int(item) for item, _ in results) == list(range(10))
+    assert {member_id for _, member_id in results} == {
+        member.id for member in pool.members
+    }
+
+
+@pytest.mark.asyncio
+async def test_pool_is_resized_at_runtime() -> None:
+    pool = Pool(actor_factory=TaggingActor, size=1)
+    actor_system = ActorSystem(actors=[pool], no_outcome_timeout=timedelta(seconds=0.1))
+
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    pool.resize(3)
+    for i in range(9):
+        await actor_system.insert_result_message(i, to_actor=pool.id)
+    assert all(
+        cast(TaggingActor, member).processed or member.mailbox.qsize()
+        for member in pool.members
+    )
+
+    removed = pool.members[1:]
+    pool.resize(1)
+    await asyncio.gather(*pool.retiring)
+    assert not any(member.id in actor_system.actors_dict for member in removed)
+
+    for i in range(9, 12):
+        await actor_system.insert_result_message(i, to_actor=pool.id)
+    actor_system.kill(drain=True)
+    await actor_system_run_task
+
+    results = []
+    async for result in actor_system.stream_actor_unpacked_results(pool):
+        results.append(result)
+    assert sorted(item for item, _ in results) == list(range(12))
@@ -0,0 +1,158 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any
+
+import pytest
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.actor_system import ActorSystem
+from etl_pipes.actors.common.types import Output
+from etl_pipes.actors.supervision import DeadLetter, RestartStrategy, Supervisor
+
+
+@dataclass
+class FailOnZeroActor(Actor):
+    name: str = "fail_on_zero"
+    restarts: int = field(init=False, default=0)
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        return Output().save_result(1 / message_data)
+
+    async def on_restart(self) -> None:
+        self.restarts += 1
+
+
+async def run_inputs(
+    actor_system: ActorSystem, actor: Actor, inputs: list[Any]
+) -> None:
+    actor_system_run_task = asyncio.create_task(actor_system.run())
+    for data in inputs:
+        await actor_system.insert_result_message(data, to_actor=actor.id)
+    await actor_system.drain()
+    actor_system.kill()
+    await actor_system_run_task
+
+
+def get_dead_letters(actor_system: ActorSystem) -> list[DeadLetter]:
+    dead_letters = []
+    while not actor_system.dead_letters.empty():
+        dead_letters.append(actor_system.dead_letters.queue.get_nowait())
+    return dead_letters
+
+
+@pytest.mark.asyncio
+async def test_failed_actor_is_restarted() -> None:
+    actor = FailOnZeroActor()
+    actor_system = ActorSystem(actors=[actor], supervisors=[Supervisor([actor])])
+
+    await run_inputs(actor_system, actor, [1, 0, 2])
+
+    assert actor.restarts == 1
+    assert not actor.stopped
+    [dead_letter] = get_dead_letters(actor_system)
+    assert dead_letter.message.data == 0
+    assert isinstance(dead_letter.exception, ZeroDivisionError)
+    results = actor_system.collected_results[actor.id]
+    assert sorted(results.get_nowait().data for _ in range(2)) == [0.5, 1.0]
+
+
+@pytest.mark.asyncio
+async def test_actor_is_stopped_after_too_many_restarts() -> None:
+    actor = FailOnZeroActor(workers=1)
+    supervisor = Supervisor([actor], max_restarts=1)
+    actor_system = ActorSystem(actors=[actor], supervisors=[supervisor])
+
+    # the stream still ends, so the system can be drained
+    await run_inputs(actor_system, actor, [0, 0, 1])
+
+    assert actor.restarts == 1
+    assert actor.stopped
+    dead_letters = get_dead_letters(actor_system)
+    assert [letter.message.data for letter in dead_letters] == [0, 0, 1]
+    assert dead_letters[-1].exception is None
+
+
+@pytest.mark.asyncio
+async def test_all_actors_are_restarted() -> None:
+    first_actor, second_actor = FailOnZeroActor(), FailOnZeroActor(name="second")
+    supervisor = Supervisor(
+        [first_actor, second_actor], strategy=RestartStrategy.ALL_FOR_ONE
+    )
+    actor_system = ActorSystem(
+        actors=[first_actor, second_actor], supervisors=[supervisor]
+    )
+
+    first_actor >> second_actor
+
+    await run_inputs(actor_system, first_actor, [0, 1])
+
+    assert (first_actor.restarts, second_actor.restarts) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_unsupervised_failures_are_dead_letters() -> None:
+    actor = FailOnZeroActor()
+    actor_system = ActorSystem(actors=[actor], dead_letters_capacity=1)
+
+    await run_inputs(actor_system, actor, [0, 0])
+
+    assert actor.restarts == 0
+    assert len(get_dead_letters(actor_system)) == 1
+    assert actor_system.dead_letters.dropped == 1
+
+
+@dataclass
+class ListSplittingActor(Actor):
+    name: str = "list_splitting"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        return Output(results=list(message_data))
+
+
+@pytest.mark.asyncio
+async def test_failed_items_of_a_batch_are_supervised() -> None:
+    splitting_actor = ListSplittingActor()
+    actor = FailOnZeroActor(workers=1)
+    supervisor = Supervisor([actor], max_restarts=1)
+    actor_system = ActorSystem(
+        actors=[splitting_actor, actor], supervisors=[supervisor]
+    )
+
+    splitting_actor >> actor
+
+    # the second failure stops the actor in the middle of the batch
+    await run_inputs(actor_system, splitting_actor, [[1, 0, 2, 0, 4]])
+
+    assert actor.restarts == 1
+    assert actor.stopped
+    dead_letters = get_dead_letters(actor_system)
+    assert [letter.message.data for letter in dead_letters] == [0, 0, 4]
+    assert dead_letters[-1].exception is None
+    results = actor_system.collected_results[actor.id]
+    assert sorted(results.get_nowait().data for _ in range(2)) == [0.5, 1.0]
+
+
+@dataclass
+class FailingRestartActor(FailOnZeroActor):
+    name: str = "failing_restart"
+
+    async def on_restart(self) -> None:
+        raise RuntimeError("can't reconnect")
+
+
+@pytest.mark.asyncio
+async def test_failed_restart_stops_the_actor() -> None:
+    actor = FailingRestartActor(workers=1)
+    supervisor = Supervisor([actor])
+    actor_system = ActorSystem(actors=[actor], supervisors=[supervisor])
+
+    async with asyncio.timeout(5):
+        await run_inputs(actor_system, actor, [1, 0, 2, 4])
+
+    assert actor.stopped
+    dead_letters = get_dead_letters(actor_system)
+    assert [letter.message.data for letter in dead_letters] == [0, 2, 4]
+    assert isinstance(dead_letters[0].exception, ZeroDivisionError)
+    assert dead_letters[1].exception is None
+    results = actor_system.collected_results[actor.id]
+    assert results.get_nowait().data == 1.0  # noqa: PLR2004
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import queue
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+
+from etl_pipes.actors.actor import Actor
+from etl_pipes.actors.actor_system import ActorSystem
+from etl_pipes.actors.common.logging import (
+    DeferredQueueHandler,
+    actor_logger,
+    start_queued_logging,
+)
+from etl_pipes.actors.common.tracing import Tracer
+from etl_pipes.actors.common.types import Message, MessageTraceId, Output
+
+
+@dataclass
+class IncrementActor(Actor):
+    name: str = "increment_actor"
+
+    async def process_result(self, message_data: Any) -> Output | None:
+        return Output().save_result(message_data + 1)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+def test_traces_are_sampled_consistently() -> None:
+    tracer = Tracer(sample_rate=0.1, actor_sample_rates={"verbose": 1.0})
+    trace_ids = [MessageTraceId(trace_id) for trace_id in range(1, 10_001)]
+
+    sampled = [tid for tid in trace_ids if tracer.is_sampled(tid, "quiet")]
+
+    assert 800 < len(sampled) < 1200  # noqa: PLR2004
+    # the same traces are sampled for every actor with the same rate
+    assert sampled == [tid for tid in trace_ids if tracer.is_sampled(tid, "other")]
+    assert all(tracer.is_sampled(tid, "verbose") for tid in trace_ids)
+    assert not tracer.is_sampled(None, "verbose")
+
+
+def test_recent_events_are_bounded() -> None:
+    tracer = Tracer(buffer_size=3)
+
+    for trace_id in range(1, 6):
+        tracer.record(
+            "sent", "actor", Message(data=None, trace_id=MessageTraceId(trace_id))
+        )
+
+    assert [event.message.trace_id for event in tracer.recent()] == [3, 4, 5]
+    assert [event.action for event in tracer.recent(MessageTraceId(4))] == ["sent"]
+
+
+@pytest.mark.asyncio
+async def test_actor_system_records_traces() -> None:
+    first_actor, second_actor = IncrementActor(), IncrementActor(name="second")
+    tracer = Tracer(log_data=True)
+    actor_system = ActorSystem(actors=[first_actor, second_actor], tracer=tracer)
+
+    first_actor >> second_actor
+
+    handler = ListHandler()
+    actor_logger.setLevel(logging.DEBUG)
+    listener = start_queued_logging(handler)
+    try:
+        actor_system_run_task = asyncio.create_task(actor_system.run())
+        await actor_system.insert_result_message(1, to_actor=first_actor.id)
+        await actor_system.drain()
+        actor_system.kill()
+        await actor_system_run_task
+    finally:
+        listener.stop()
+        actor_logger.handlers.clear()
+        actor_logger.setLevel(logging.NOTSET)
+
+    trace_id = tracer.recent()[0].message.trace_id
+    assert [
+        (event.actor_name, event.message.data) for event in tracer.recent(trace_id)
+    ] == [
+        ("increment_actor", 1),
+        ("second", 2),
+        ("second", 3),
+    ]
+    # the events are logged by the listener thread
+    assert handler.messages == [str(event) for event in tracer.recent(trace_id)]
+
+
+def test_queued_records_keep_their_messages() -> None:
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    actor_logger.addHandler(DeferredQueueHandler(records))
+    items = [1]
+    try:
+        actor_logger.warning("items %s", items)
+    finally:
+        actor_logger.handlers.clear()
+    # changed by the event loop before the listener thread formats the record
+    items.append(2)
+
+    assert records.get_nowait().getMessage() == "items [1]"
@@ -0,0 +1,58 @@
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+
+from etl_pipes.executors.process_pool import get_process_pool
+from etl_pipes.pipes.base_pipe import as_pipe
+from etl_pipes.pipes.map_reduce import MapReduce
+from etl_pipes.pipes.parallel import Parallel
+
+
+@as_pipe(executor="process")
+def get_pid() -> int:
+    return os.getpid()
+
+
+@as_pipe(executor="process")
+def square(a: int) -> int:
+    return a * a
+
+
+def cube(a: int) -> int:
+    return a * a * a
+
+
+@pytest.mark.asyncio
+async def test_process_pipe_runs_in_worker_process() -> None:
+    assert await get_pid() != os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_parallel_with_process_pipes() -> None:
+    parallel = Parallel([square, square, square])
+
+    result = await parallel(1, 2, 3)
+
+    assert result == (1, 4, 9)
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_with_process_pool() -> None:
+    @dataclass
+    class SumOfCubes(MapReduce):
+        async def split(self, iterable: Iterable[Any]) -> Iterable[Any]:
+            return list(iterable)
+
+        async def map(self, chunks: Iterable[Any]) -> Iterable[Any]:
+            return await get_process_pool().map(cube, chunks, chunksize=16)
+
+        async def reduce(self, mapped_chunks: Iterable[Any]) -> Any:
+            return sum(mapped_chunks)
+
+    numbers = range(100)
+    result = await SumOfCubes()(numbers)
+
+    assert result == sum(n**3 for n in numbers)
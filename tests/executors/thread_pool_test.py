@@ -0,0 +1,52 @@
+import threading
+from collections.abc import Generator
+
+import pytest
+
+from etl_pipes.executors.thread_pool import configure_thread_pool, get_thread_pool
+from etl_pipes.pipes.base_pipe import as_pipe
+
+
+@pytest.fixture
+def restore_thread_pool() -> Generator[None, None, None]:
+    # the pool is global, so its threads and configuration must not leak
+    # into other tests
+    previous = get_thread_pool()
+    yield
+    get_thread_pool().shutdown()
+    configure_thread_pool(previous.max_workers, previous.thread_name_prefix)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("restore_thread_pool")
+async def test_thread_pipe_runs_outside_event_loop_thread() -> None:
+    @as_pipe(executor="thread")
+    def get_thread_name() -> str:
+        return threading.current_thread().name
+
+    @as_pipe
+    def get_loop_thread_name() -> str:
+        return threading.current_thread().name
+
+    assert await get_loop_thread_name() == threading.current_thread().name
+    assert (await get_thread_name()).startswith("etl-pipes")
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("restore_thread_pool")
+async def test_thread_pool_metrics() -> None:
+    pool = configure_thread_pool(max_workers=2)
+
+    @as_pipe(executor="thread")
+    def div(a: int, b: int) -> float:
+        return a / b
+
+    assert await div(1, 1) == 1
+    with pytest.raises(ZeroDivisionError):
+        await div(1, 0)
+
+    assert get_thread_pool() is pool
+    assert pool.metrics.submitted == pool.metrics.completed + pool.metrics.failed
+    assert pool.metrics.completed == 1
+    assert pool.metrics.failed == 1
+    assert pool.metrics.in_flight == 0
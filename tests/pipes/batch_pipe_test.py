@@ -0,0 +1,100 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+
+import pytest
+
+from etl_pipes.pipes.base_pipe import as_pipe
+from etl_pipes.pipes.batch_pipe import BatchPipe, BatchResultsMismatchError
+from etl_pipes.pipes.pipeline.pipeline import Pipeline
+
+
+@dataclass
+class DoubleMany(BatchPipe):
+    max_batch_size: int = field(default=10, kw_only=True)
+    max_linger: timedelta = field(
+        default_factory=lambda: timedelta(milliseconds=10), kw_only=True
+    )
+
+    batch_sizes: list[int] = field(default_factory=list)
+
+    async def process_batch(self, items: list[Any]) -> list[Any]:
+        self.batch_sizes.append(len(items))
+        await asyncio.sleep(0.01)
+        return [item * 2 for item in items]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_coalesced_into_batches() -> None:
+    double = DoubleMany()
+
+    results = await asyncio.gather(*(double(n) for n in range(25)))
+
+    assert list(results) == [n * 2 for n in range(25)]
+    assert double.batch_sizes == [10, 10, 5]
+
+
+@pytest.mark.asyncio
+async def test_single_call_is_flushed_after_linger() -> None:
+    double = DoubleMany()
+
+    answer = 42
+    assert await double(answer // 2) == answer
+    assert double.batch_sizes == [1]
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_are_scattered_to_callers() -> None:
+    @dataclass
+    class LoseOne(BatchPipe):
+        async def process_batch(self, items: list[Any]) -> list[Any]:
+            return items[1:]
+
+    lose_one = LoseOne()
+
+    results = await asyncio.gather(lose_one(1), lose_one(2), return_exceptions=True)
+
+    assert all(isinstance(r, BatchResultsMismatchError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_pipe_in_stream() -> None:
+    @as_pipe
+    def inc(a: int) -> int:
+        return a + 1
+
+    double = DoubleMany()
+    pipeline = Pipeline([inc, double])
+
+    results = [
+        result async for result in pipeline.stream(range(100), concurrency=[1, 10])
+    ]
+
+    assert results == [(n + 1) * 2 for n in range(100)]
+    assert max(double.batch_sizes) == double.max_batch_size
+
+
+@pytest.mark.asyncio
+async def test_batch_limits_are_set_per_instance() -> None:
+    small, large = DoubleMany(max_batch_size=2), DoubleMany(max_batch_size=5)
+
+    await asyncio.gather(*(small(n) for n in range(5)), *(large(n) for n in range(5)))
+
+    assert small.batch_sizes == [2, 2, 1]
+    assert large.batch_sizes == [5]
+    with pytest.raises(ValueError):
+        DoubleMany(max_batch_size=0)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_flush_cancels_callers() -> None:
+    double = DoubleMany(max_batch_size=2)
+
+    calls = [asyncio.create_task(double(n)) for n in range(2)]
+    await asyncio.sleep(0)
+    for flush in list(double._flushes):
+        flush.cancel()
+
+    results = await asyncio.wait_for(asyncio.gather(*calls, return_exceptions=True), 1)
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
@@ -0,0 +1,132 @@
+import asyncio
+import gc
+from datetime import timedelta
+
+import pytest
+
+from etl_pipes.pipes.base_pipe import as_pipe
+from etl_pipes.pipes.cached import Cached
+from etl_pipes.pipes.maybe import Maybe, Nothing
+from etl_pipes.pipes.parallel import Parallel
+from etl_pipes.pipes.pipeline.pipeline import Pipeline
+
+
+def counting_square() -> tuple[list[int], Cached]:
+    calls: list[int] = []
+
+    @as_pipe
+    async def square(a: int) -> int:
+        calls.append(a)
+        await asyncio.sleep(0.01)
+        return a * a
+
+    return calls, Cached(square)
+
+
+@pytest.mark.asyncio
+async def test_cached_returns_stored_result() -> None:
+    calls, cached = counting_square()
+
+    assert await cached(2) == await cached(2)
+    assert calls == [2]
+    assert cached.stats.hits == 1
+    assert cached.stats.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_are_coalesced() -> None:
+    calls, cached = counting_square()
+
+    results = await asyncio.gather(*(cached(3) for _ in range(10)))
+
+    assert set(results) == {9}
+    assert calls == [3]
+    assert cached.stats.coalesced == len(results) - 1
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_ttl() -> None:
+    calls, cached = counting_square()
+    cached.maxsize = 2
+    cached.ttl = timedelta(seconds=0.05)
+
+    for n in [1, 2, 3, 1]:
+        await cached(n)
+    assert calls == [1, 2, 3, 1]
+    assert cached.stats.evictions == len(calls) - cached.maxsize
+
+    await asyncio.sleep(0.1)
+    await cached(1)
+    assert calls == [1, 2, 3, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_cached_inside_pipeline_parallel_and_maybe() -> None:
+    calls, cached = counting_square()
+    lookups = []
+
+    @as_pipe
+    async def lookup(a: int) -> str:
+        lookups.append(a)
+        if len(lookups) == 1:
+            raise Nothing()
+        return "lookup"
+
+    @as_pipe
+    async def fallback(a: int) -> str:
+        return "fallback"
+
+    @as_pipe
+    async def add(a: int, b: int) -> int:
+        return a + b
+
+    pipeline = Pipeline(
+        [
+            Parallel([cached, cached]),
+            add,
+            Maybe(Cached(lookup)).otherwise(fallback),
+        ]
+    )
+
+    # Nothing is not cached, so the lookup is retried on the next call
+    results = [await pipeline(2, 2) for _ in range(3)]
+
+    assert results == ["fallback", "lookup", "lookup"]
+    assert calls == [2]
+    assert lookups == [8, 8]
+
+
+@pytest.mark.asyncio
+async def test_arguments_of_different_types_are_cached_separately() -> None:
+    calls, cached = counting_square()
+
+    await cached(1)
+    await cached(1.0)
+    await cached(True)
+    await cached(1)
+
+    assert calls == [1, 1.0, True]
+    cached.invalidate(1.0)
+    await cached(1.0)
+    assert calls == [1, 1.0, True, 1.0]
+
+
+@pytest.mark.asyncio
+async def test_failed_load_without_callers_is_retrieved() -> None:
+    @as_pipe
+    async def broken(a: int) -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError("broken")
+
+    unretrieved = []
+    asyncio.get_running_loop().set_exception_handler(
+        lambda _, context: unretrieved.append(context)
+    )
+    cached = Cached(broken)
+
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(cached(1), 0.001)
+    await asyncio.sleep(0.05)
+    gc.collect()
+
+    assert not unretrieved
@@ -1,9 +1,14 @@
+import gc
+import weakref
 from dataclasses import dataclass
 
 import pytest
 
 from etl_pipes.context import Context, full, single
 from etl_pipes.pipes.base_pipe import Pipe
+from etl_pipes.pipes.cached import Cached
+from etl_pipes.pipes.maybe import Maybe
+from etl_pipes.pipes.parallel import Parallel
 from etl_pipes.pipes.pipeline.pipeline import Pipeline
 
 
@@ -61,3 +66,83 @@ async def test_simple_context() -> None:
     pipeline_result = await pipeline(1)
     true_result = 1 * 2 % 37 * 3 % 37 * 4 % 37 * 5 % 37 * 6 % 29 * 4 % 23
     assert true_result == pipeline_result
+
+
+def test_context_parts_are_looked_up_by_name() -> None:
+    @dataclass
+    class WideContext(Context):
+        first: int
+        second: str
+
+    context = WideContext(first=1, second="2")
+
+    assert context.has_part("second", str)
+    assert not context.has_part("second", int)
+    assert not context.has_part("third", int)
+    assert context.get_part("first") == 1
+    assert context.get_part("third") is None
+
+
+def test_context_parts_do_not_keep_classes() -> None:
+    @dataclass
+    class TemporaryContext(Context):
+        offset: int
+
+    assert TemporaryContext(offset=1).get_part("offset") == 1
+    context_class = weakref.ref(TemporaryContext)
+    del TemporaryContext
+    gc.collect()
+
+    assert context_class() is None
+
+
+@pytest.mark.asyncio
+async def test_context_is_applied_to_nested_pipes() -> None:
+    @dataclass
+    class OffsetContext(Context):
+        offset: int
+
+    @dataclass
+    class OffsetPipe(Pipe):
+        offset: int = single(OffsetContext)  # noqa: RUF009
+
+        async def __call__(self, *data: int) -> int:
+            return sum(data) + self.offset
+
+    pipeline = Pipeline(
+        [
+            Parallel([OffsetPipe(), Cached(OffsetPipe())]),
+            Maybe(OffsetPipe()),
+        ],
+        context=OffsetContext(offset=10),
+    )
+
+    assert await pipeline(1, 2) == 1 + 10 + 2 + 10 + 10
+
+
+@pytest.mark.asyncio
+async def test_injection_plans_do_not_keep_classes() -> None:
+    @dataclass
+    class TemporaryContext(Context):
+        offset: int
+
+    @dataclass
+    class TemporaryPipe(Pipe):
+        offset: int = single(TemporaryContext)  # noqa: RUF009
+
+        async def __call__(self, *data: int) -> int:
+            return sum(data) + self.offset
+
+    pipeline = Pipeline([TemporaryPipe()], context=TemporaryContext(offset=1))
+    assert await pipeline(1) == 1 + 1
+    context_class, pipe_class = weakref.ref(TemporaryContext), weakref.ref(
+        TemporaryPipe
+    )
+    del TemporaryContext, TemporaryPipe, pipeline
+    # the cached fields of the pipe class refer to the context class,
+    # so it is only freed by the collection after the pipe class
+    gc.collect()
+    gc.collect()
+
+    assert context_class() is None
+    assert pipe_class() is None
@@ -0,0 +1,119 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+
+import pytest
+
+from etl_pipes.pipes.base_pipe import as_pipe
+from etl_pipes.pipes.parallel_map_reduce import ParallelMapReduce
+
+
+@as_pipe
+def add(accumulator: int, value: int) -> int:
+    return accumulator + value
+
+
+@as_pipe
+def concat(accumulator: list[int], values: list[int]) -> list[int]:
+    return [*accumulator, *values]
+
+
+def numbers(count: int) -> Iterator[int]:
+    yield from range(count)
+
+
+@pytest.mark.asyncio
+async def test_parallel_map_reduce_bounds_in_flight_chunks() -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    @as_pipe
+    async def sum_of_squares(chunk: list[int]) -> int:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return sum(n * n for n in chunk)
+
+    map_reduce = ParallelMapReduce(
+        mapper=sum_of_squares,
+        reducer=add,
+        initial=0,
+        chunk_size=10,
+        max_in_flight=3,
+    )
+
+    count = 1000
+    result = await map_reduce(numbers(count))
+
+    assert result == sum(n * n for n in range(count))
+    assert max_in_flight == map_reduce.max_in_flight
+
+
+@pytest.mark.asyncio
+async def test_parallel_map_reduce_ordered() -> None:
+    @as_pipe
+    async def reverse_delay(chunk: list[int]) -> list[int]:
+        # earlier chunks complete later
+        await asyncio.sleep(0.01 * (10 - chunk[0] // 10))
+        return chunk
+
+    async def async_numbers() -> AsyncIterator[int]:
+        for n in range(100):
+            yield n
+
+    map_reduce = ParallelMapReduce(
+        mapper=reverse_delay,
+        reducer=concat,
+        initial=[],
+        chunk_size=10,
+        max_in_flight=4,
+        ordered=True,
+    )
+
+    result = await map_reduce(async_numbers())
+
+    assert result == list(range(100))
+
+
+@pytest.mark.asyncio
+async def test_parallel_map_reduce_propagates_mapper_error() -> None:
+    @as_pipe
+    async def fail_on_second_chunk(chunk: list[int]) -> int:
+        if chunk[0] > 0:
+            raise ValueError("broken chunk")
+        return sum(chunk)
+
+    map_reduce = ParallelMapReduce(
+        mapper=fail_on_second_chunk,
+        reducer=add,
+        initial=0,
+        chunk_size=10,
+    )
+
+    with pytest.raises(ValueError, match="broken chunk"):
+        await map_reduce(numbers(100))
+
+
+@pytest.mark.asyncio
+async def test_parallel_map_reduce_awaits_chunks_on_error() -> None:
+    tasks = []
+
+    @as_pipe
+    async def fail_after_first_chunk(chunk: list[int]) -> int:
+        tasks.append(asyncio.current_task())
+        if chunk[0] == 0:
+            await asyncio.sleep(1)
+        raise ValueError("broken chunk")
+
+    map_reduce = ParallelMapReduce(
+        mapper=fail_after_first_chunk,
+        reducer=add,
+        initial=0,
+        chunk_size=10,
+    )
+
+    with pytest.raises(ValueError, match="broken chunk"):
+        await map_reduce(numbers(100))
+    # the slow chunk is cancelled and the other failed chunks are retrieved
+    assert all(task is not None and task.done() for task in tasks)
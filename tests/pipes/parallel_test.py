@@ -110,3 +110,103 @@ async def test_parallel_with_no_arguments() -> None:
     assert diff < limit
 
     assert result == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_parallel_overlaps_blocking_thread_pipes() -> None:
+    @as_pipe(executor="thread")
+    def blocking_one() -> int:
+        time.sleep(0.5)
+        return 1
+
+    @as_pipe(executor="thread")
+    def blocking_two() -> int:
+        time.sleep(0.5)
+        return 2
+
+    parallel = Parallel(
+        [
+            blocking_one,
+            blocking_two,
+        ],
+    )
+
+    start_time_ms = int(time.time() * 1000)
+
+    result = await parallel()
+
+    end_time_ms = int(time.time() * 1000)
+    limit = 1000
+    diff = end_time_ms - start_time_ms
+    assert diff < limit
+
+    assert result == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_parallel_fail_fast_cancels_siblings() -> None:
+    finished = []
+
+    @as_pipe
+    async def fail() -> int:
+        await asyncio.sleep(0.1)
+        raise ValueError("failed branch")
+
+    @as_pipe
+    async def slow() -> int:
+        await asyncio.sleep(0.5)
+        finished.append(1)
+        return 1
+
+    parallel = Parallel([fail, slow, slow])
+
+    with pytest.raises(ValueError, match="failed branch"):
+        await parallel()
+
+    await asyncio.sleep(0.5)
+    assert finished == []
+
+
+@pytest.mark.asyncio
+async def test_parallel_without_fail_fast_waits_for_siblings() -> None:
+    finished = []
+
+    @as_pipe
+    async def fail() -> int:
+        raise ValueError("failed branch")
+
+    @as_pipe
+    async def slow() -> int:
+        await asyncio.sleep(0.1)
+        finished.append(1)
+        return 1
+
+    parallel = Parallel([slow, fail, slow], fail_fast=False)
+
+    with pytest.raises(ValueError, match="failed branch"):
+        await parallel()
+
+    assert finished == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_parallel_max_concurrency() -> None:
+    running = 0
+    max_running = 0
+
+    @as_pipe
+    async def shard(n: int) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return n
+
+    shards = 100
+    parallel = BroadcastParallel([shard] * shards, max_concurrency=10)
+
+    result = await parallel(1)
+
+    assert result == (1,) * shards
+    assert max_running == parallel.max_concurrency
@@ -0,0 +1,132 @@
+import pytest
+
+from etl_pipes.pipes.base_pipe import Pipe, as_pipe
+from etl_pipes.pipes.pipeline.pipeline import Pipeline
+from etl_pipes.pipes.void import Void
+
+
+@as_pipe
+def get_token_full() -> tuple[str, str, dict[str, str]]:
+    return "token", "token_meta", {"info": "info"}
+
+
+@as_pipe
+def verify_token(token: str) -> bool:
+    return token == "token"
+
+
+@as_pipe
+def verify_pair(token: str, token_meta: str) -> bool:
+    return token == "token" and token_meta == "token_meta"
+
+
+@as_pipe
+def verify_token_and_info(token: str, info: dict[str, str]) -> bool:
+    return token == "token" and info == {"info": "info"}
+
+
+@as_pipe
+def mod(a: int, b: int) -> tuple[int, int, int]:
+    return a, b, a % b
+
+
+@as_pipe
+def print_(a: int, b: int, a_mod_b: int) -> str:
+    return f"{a} % {b} = {a_mod_b}"
+
+
+@as_pipe
+async def add_one(a: int) -> int:
+    return a + 1
+
+
+@as_pipe
+async def double(a: int) -> int:
+    return a * 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "pipes",
+    [
+        [get_token_full[0], verify_token],
+        [get_token_full[0:2], verify_pair],
+        [get_token_full[(0, 2)], verify_token_and_info],
+        [get_token_full, Void(), Pipeline([get_token_full[0], verify_token])],
+    ],
+)
+async def test_compiled_pipeline_selectors(pipes: list[Pipe]) -> None:
+    interpreted = Pipeline(pipes)
+    compiled = Pipeline(pipes).compile()
+
+    assert await compiled() is True
+    assert await compiled() == await interpreted()
+
+
+@pytest.mark.asyncio
+async def test_compiled_pipeline_flattens_nested_pipelines() -> None:
+    pipeline = Pipeline(
+        [
+            add_one,
+            Pipeline([add_one, Pipeline([add_one, add_one]), add_one]),
+            add_one,
+        ]
+    ).compile()
+
+    stages_count = 6
+    assert pipeline.plan is not None
+    assert len(pipeline.plan.stages) == stages_count
+    assert await pipeline(0) == stages_count
+
+
+@pytest.mark.asyncio
+async def test_compiled_pipeline_tuple_arg_flow() -> None:
+    pipeline = Pipeline([mod, print_]).compile()
+
+    assert await pipeline(10, 3) == "10 % 3 = 1"
+
+
+@pytest.mark.asyncio
+async def test_compiled_pipeline_is_rebuilt_on_append() -> None:
+    pipeline = Pipeline([add_one, add_one]).compile()
+    pipeline >> add_one
+
+    stages_count = 3
+    assert await pipeline(0) == stages_count
+
+
+@pytest.mark.asyncio
+async def test_compiled_pipeline_is_rebuilt_on_append_to_nested_pipeline() -> None:
+    inner = Pipeline([add_one])
+    pipeline = Pipeline([add_one, inner]).compile()
+    inner >> add_one
+
+    stages_count = 3
+    assert await pipeline(0) == stages_count
+    assert await pipeline(0) == await Pipeline([add_one, inner])(0)
+
+
+@pytest.mark.asyncio
+async def test_compiled_pipeline_is_rebuilt_lazily() -> None:
+    pipeline = Pipeline([add_one]).compile()
+    plan = pipeline.plan
+    for _ in range(9):
+        pipeline >> add_one
+
+    # appends don't rebuild the plan, the next call does it once
+    assert pipeline.plan is plan
+    assert await pipeline(0) == 10  # noqa: PLR2004
+    assert pipeline.plan is not plan
+
+
+@pytest.mark.asyncio
+async def test_compiled_pipeline_is_rebuilt_on_any_change() -> None:
+    inner = Pipeline([add_one])
+    pipeline = Pipeline([add_one, inner]).compile()
+
+    inner.pipes.append(add_one)
+    assert await pipeline(0) == 3  # noqa: PLR2004
+    inner.pipes[1] = double
+    assert await pipeline(0) == 4  # noqa: PLR2004
+    pipeline.pipes = [add_one]
+    assert await pipeline(0) == 1
@@ -2,7 +2,19 @@ from typing import Any
 
 import pytest
 
-from etl_pipes.pipes.pipeline.pipe_welding_validator import is_compatible_type
+from etl_pipes.pipes.base_pipe import as_pipe
+from etl_pipes.pipes.pipeline.exceptions import (
+    ElementIsNotPipeError,
+    PipelineTypeError,
+)
+from etl_pipes.pipes.pipeline.pipe_welding_validator import (
+    PipeTyping,
+    get_pipe_typing,
+    is_compatible_type,
+)
+from etl_pipes.pipes.pipeline.pipeline import Pipeline
+from tests.etl.odds.transform_pipe import OuterToInnerPipe
+from tests.etl.odds.types import InnerOdds, OuterOdds
 
 
 @pytest.mark.parametrize(
@@ -35,3 +47,29 @@ def test_is_compatible_type(
         f"Expected {expected} but got {result} "
         f"while testing {value_type} against {signature_type}"
     )
+
+
+def test_pipe_typing_is_cached_per_pipe_class() -> None:
+    first_typing = get_pipe_typing(OuterToInnerPipe())
+    second_typing = get_pipe_typing(OuterToInnerPipe())
+
+    assert first_typing is second_typing
+    assert first_typing == PipeTyping(arg_type=OuterOdds, return_type=InnerOdds)
+
+
+def test_append_validates_only_new_edge() -> None:
+    @as_pipe
+    def to_str(a: int) -> str:
+        return str(a)
+
+    @as_pipe
+    def to_int(a: str) -> int:
+        return int(a)
+
+    pipeline = Pipeline([to_int, to_str], ignore_validation=False)
+    pipeline >> to_int
+
+    with pytest.raises(PipelineTypeError):
+        pipeline >> to_int
+    with pytest.raises(ElementIsNotPipeError):
+        pipeline >> to_str.func  # type: ignore[operator]
@@ -0,0 +1,91 @@
+import asyncio
+import random
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+
+import pytest
+
+from etl_pipes.pipes.base_pipe import as_pipe
+from etl_pipes.pipes.pipeline.pipeline import Pipeline
+
+
+@as_pipe
+async def slow_double(a: int) -> int:
+    await asyncio.sleep(random.uniform(0, 0.01))
+    return a * 2
+
+
+@as_pipe
+def split(a: int) -> tuple[int, int]:
+    return a, a + 1
+
+
+@as_pipe
+def sum_(a: int, b: int) -> int:
+    return a + b
+
+
+async def numbers(count: int) -> AsyncIterator[int]:
+    for n in range(count):
+        yield n
+
+
+@pytest.mark.asyncio
+async def test_stream_keeps_order_with_concurrent_stages() -> None:
+    pipeline = Pipeline([slow_double, split, sum_])
+
+    results = [
+        result async for result in pipeline.stream(numbers(100), concurrency=[8, 1, 2])
+    ]
+
+    assert results == [n * 4 + 1 for n in range(100)]
+
+
+@pytest.mark.asyncio
+async def test_unordered_stream() -> None:
+    pipeline = Pipeline([slow_double, slow_double])
+
+    results = [
+        result
+        async for result in pipeline.stream(range(100), concurrency=4, ordered=False)
+    ]
+
+    assert sorted(results) == [n * 4 for n in range(100)]
+
+
+@pytest.mark.asyncio
+async def test_stream_applies_backpressure_to_source() -> None:
+    produced = 0
+
+    async def endless() -> AsyncIterator[int]:
+        nonlocal produced
+        while True:
+            produced += 1
+            yield produced
+
+    pipeline = Pipeline([slow_double, slow_double])
+    buffer_size = 2
+
+    # closes the stream and stops its stages when the loop is left
+    async with aclosing(pipeline.stream(endless(), buffer_size=buffer_size)) as stream:
+        async for result in stream:
+            if result > buffer_size:
+                break
+
+    # records are bounded by buffers in front of stages and the consumer
+    assert produced <= buffer_size * 3 + 2 + 1
+
+
+@pytest.mark.asyncio
+async def test_stream_propagates_errors() -> None:
+    @as_pipe
+    def fail_on_ten(a: int) -> int:
+        if a == 10:  # noqa: PLR2004
+            raise ValueError("ten")
+        return a
+
+    pipeline = Pipeline([fail_on_ten, slow_double])
+
+    with pytest.raises(ValueError, match="ten"):
+        async for _ in pipeline.stream(numbers(100)):
+            pass
@@ -0,0 +1,127 @@
+import asyncio
+import gc
+import time
+from datetime import timedelta
+
+import pytest
+
+from etl_pipes.pipes.base_pipe import as_pipe
+from etl_pipes.pipes.maybe import Nothing, UnhandledNothingError
+from etl_pipes.pipes.race import Race
+
+cancelled = []
+
+
+@as_pipe
+async def slow_primary() -> str:
+    try:
+        await asyncio.sleep(1)
+    except asyncio.CancelledError:
+        cancelled.append("primary")
+        raise
+    return "primary"
+
+
+@as_pipe
+async def fast_fallback() -> str:
+    await asyncio.sleep(0.1)
+    return "fallback"
+
+
+@as_pipe
+async def missing() -> str:
+    raise Nothing()
+
+
+@pytest.mark.asyncio
+async def test_race_returns_first_result_and_cancels_rest() -> None:
+    cancelled.clear()
+    race = Race(slow_primary).otherwise(fast_fallback)
+
+    start_time_ms = int(time.time() * 1000)
+
+    result = await race()
+
+    end_time_ms = int(time.time() * 1000)
+    limit = 500
+    diff = end_time_ms - start_time_ms
+    assert diff < limit
+
+    assert result == "fallback"
+    assert cancelled == ["primary"]
+
+
+@pytest.mark.asyncio
+async def test_race_skips_nothing() -> None:
+    race = Race(missing).otherwise(fast_fallback)
+    assert await race() == "fallback"
+
+    race = Race(missing).otherwise(missing)
+    with pytest.raises(UnhandledNothingError):
+        await race()
+
+
+@pytest.mark.asyncio
+async def test_hedge_starts_fallback_after_delay() -> None:
+    started = []
+
+    @as_pipe
+    async def primary() -> str:
+        started.append("primary")
+        await asyncio.sleep(0.3)
+        return "primary"
+
+    @as_pipe
+    async def fallback() -> str:
+        started.append("fallback")
+        return "fallback"
+
+    fast_race = Race(primary, hedge_delay=timedelta(seconds=0.5)).otherwise(fallback)
+    assert await fast_race() == "primary"
+    assert started == ["primary"]
+
+    started.clear()
+    slow_race = Race(primary, hedge_delay=timedelta(seconds=0.1)).otherwise(fallback)
+    assert await slow_race() == "fallback"
+    assert started == ["primary", "fallback"]
+
+
+@pytest.mark.asyncio
+async def test_hedge_starts_fallback_on_nothing() -> None:
+    race = Race(missing, hedge_delay=timedelta(seconds=10)).otherwise(fast_fallback)
+
+    start_time_ms = int(time.time() * 1000)
+
+    result = await race()
+
+    end_time_ms = int(time.time() * 1000)
+    limit = 500
+    diff = end_time_ms - start_time_ms
+    assert diff < limit
+
+    assert result == "fallback"
+
+
+@pytest.mark.asyncio
+async def test_race_takes_pipes_finished_together_in_order() -> None:
+    @as_pipe
+    async def broken() -> str:
+        raise ValueError("broken")
+
+    @as_pipe
+    async def first() -> str:
+        return "first"
+
+    @as_pipe
+    async def second() -> str:
+        return "second"
+
+    unretrieved = []
+    asyncio.get_running_loop().set_exception_handler(
+        lambda _, context: unretrieved.append(context)
+    )
+    race = Race(broken).otherwise(second).otherwise(first)
+
+    assert {await race() for _ in range(10)} == {"second"}
+    gc.collect()
+    assert not unretrieved